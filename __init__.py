@@ -1,7 +1,30 @@
 __version__ = "1.0.0"
 __MP__ = __file__.replace('\\', '/').rsplit('/', 1)[0]
 
+import os, time
+
+LAZY_INIT = os.environ.get("ATI_LAZY_INIT", "0") not in ("", "0")  # defer startup work to first use
+IMPORT_TIMES = {}  # startup step: seconds, see importReport
+
+
+def timeStep(name, func):
+    start = time.perf_counter()
+    result = func()
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return result
+
+
+def importReport():
+    total = sum(IMPORT_TIMES.values())
+    print(f"AllTheInputs import: {total * 1000:.1f}ms{' (lazy)' if LAZY_INIT else ''}")
+    for name, seconds in IMPORT_TIMES.items():
+        print(f"    {name}: {seconds * 1000:.1f}ms")
+    return dict(IMPORT_TIMES)
+
+
+_start = time.perf_counter()
 from . import inputSet, compounds, signature
+IMPORT_TIMES["import modules"] = time.perf_counter() - _start
 
 
 def shelf():
@@ -9,4 +32,6 @@ def shelf():
     mel.eval(f'loadNewShelf "{__MP__}/scripts/shelf_AllTheInputs.mel";')
 
 
-compounds.verifyLib()
\ No newline at end of file
+if not LAZY_INIT:
+    timeStep("create default signatures", signature.createDefaultSignatures)
+    timeStep("verify compound library", compounds.verifyLib)
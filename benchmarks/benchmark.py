@@ -0,0 +1,268 @@
+"""
+Scaling benchmarks for the package's hot paths, run against the offline Maya stand-in in fakeMaya.
+Each case is run at several sizes and reports the commands it issued, wall time, modelled Maya time and
+the scaling exponent of each, ie. 1.0 is linear, 2.0 is quadratic.
+
+    python benchmarks/benchmark.py
+    python benchmarks/benchmark.py --sizes 10 1000 --signatures 1 50 --cases update_full sort --json results.json
+
+Wall time measures the package's own Python overhead plus the fake, modelled time estimates Maya's share,
+see fakeMaya.LATENCY. Command counts are exact and are the numbers to watch for regressions.
+"""
+
+import os, sys, io, math, time, json, shutil, argparse, tempfile, importlib, contextlib
+
+import fakeMaya
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [10, 1000, 20000]  # set members
+SIGNATURE_SIZES = [1, 10, 100, 500]  # signatures / node types
+BOBIFY_SIZES = [10, 100, 1000]  # bobify graphs are ~100x the work of a plain input, see --bobify-sizes
+SCENE = fakeMaya.install()
+os.environ["ATI_LAZY_INIT"] = "1"
+sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+ati = importlib.import_module(os.path.basename(PACKAGE_DIR))
+bif = importlib.import_module(f"{ati.__name__}.packages.bifrostUtils")
+userdata = importlib.import_module(f"{ati.__name__}.packages.userdata")
+
+
+# Setup ================================================================================================================
+def resetPackage(data_dir):
+    """Clears every cache the package keeps between calls, and points its userdata at data_dir."""
+    signature, compounds, bobify = ati.signature, ati.compounds, ati.bobify
+    signature.SIGNATURES.clear()
+    signature.STATIC_ATTRS.clear()
+    signature.PLUGIN_TYPES.clear()
+    signature.LOADED_PLUGINS = None
+    signature.DEFAULTS_CREATED = False
+    signature.INDEX = None
+    signature.SIGNATURES_DIR = f"{data_dir}/signatures"
+    signature.INDEX_FILE = f"{data_dir}/signature_index.json"
+    signature.AUTO_SIGNATURES_DIR = f"{data_dir}/auto_signatures"
+    compounds.LIB_PATH = f"{data_dir}/compounds"
+    compounds.MANIFEST_FILE = f"{data_dir}/compounds/manifest.json"
+    compounds.MANIFEST = None
+    compounds.PUBLISHED = None
+    compounds.LIB_VERIFIED = False
+    bobify.PROTOTYPES.clear()
+    bobify.COLLECTOR.__init__()  # deferred collects are dropped with the scene
+    bif.ATTR_INFO.clear()
+    bif.TYPE_ATTRS.clear()
+    ati.inputSet.CALLBACKS.clear()
+
+
+def newScene(data_dir):
+    shutil.rmtree(data_dir, ignore_errors=True)
+    shutil.copytree(f"{PACKAGE_DIR}/userdata/signatures", f"{data_dir}/signatures")
+    SCENE.clear()
+    resetPackage(data_dir)
+
+
+def createMembers(n) -> list[str]:
+    """Creates n transforms, split between meshes, curves and plain transforms like a typical set."""
+    members = []
+    for x in range(n):
+        if x % 5 < 2:
+            members.append(SCENE.createShape("mesh", f"mesh{x}").name)
+        elif x % 5 == 2:
+            members.append(SCENE.createShape("nurbsCurve", f"curve{x}").name)
+        else:
+            members.append(SCENE.createNode("transform", f"xform{x}").name)
+    return members
+
+
+def defineSignatureTypes(n, attrs=20, save=True) -> list[str]:
+    """Defines n node types with attrs each and a mesh geo attr, optionally with a saved signature for each."""
+    node_types = []
+    for x in range(n):
+        node_type = f"benchNode{x}"
+        type_attrs = {f"attr{y}": "double" if y % 2 else "float3" for y in range(attrs)}
+        fakeMaya.defineType(node_type, {**type_attrs, "inMesh": "mesh"}, dag=True, shape=True, plugin="benchPlugin")
+        if save:
+            sig = ati.signature.Signature(node_type, attrs=list(type_attrs), geo_attr="inMesh")
+            userdata.Userdata.save(sig)
+        node_types.append(node_type)
+    return node_types
+
+
+def newInputSet(set_name):
+    """An InputSet with its graph created, but not yet updated."""
+    input_set = ati.inputSet.InputSet(set_name)
+    input_set.graph = input_set.createGraph()
+    input_set.wiring = "api"  # as updated by inputSet.UpdateScheduler.flush
+    return input_set
+
+
+# Cases ================================================================================================================
+"""
+Each case takes (size, data dir) and returns the function to measure, anything before that is setup.
+"""
+
+
+def caseUpdateFull(n, data_dir):
+    """First sync of an n member set, every input is new."""
+    input_set = newInputSet(SCENE.createSet("benchSet", createMembers(n)).name)
+    return input_set.updateGraph
+
+
+def caseUpdateRescan(n, data_dir):
+    """Rescan of an n member set that has not changed."""
+    input_set = newInputSet(SCENE.createSet("benchSet", createMembers(n)).name)
+    input_set.updateGraph()
+    return input_set.updateGraph
+
+
+def caseUpdateDelta(n, data_dir):
+    """One member added to and one removed from an n member set, applied as a delta."""
+    members = createMembers(n)
+    object_set = SCENE.createSet("benchSet", members)
+    input_set = newInputSet(object_set.name)
+    input_set.updateGraph()
+    added = SCENE.createShape("mesh", "addedMesh")
+    SCENE.addMembers(object_set, [added])
+    SCENE.removeMembers(object_set, [members[0]])
+    return lambda: input_set.updateGraph(added=[added.longName()], removed=[SCENE.get(members[0]).longName()])
+
+
+def caseUpdateRebuild(n, data_dir):
+    """Full rebuild of an n member set, the non-incremental path."""
+    input_set = newInputSet(SCENE.createSet("benchSet", createMembers(n)).name)
+    input_set.updateGraph()
+    input_set.incremental = False
+    return input_set.updateGraph
+
+
+def caseSort(n, data_dir):
+    members = createMembers(n)
+    return lambda: ati.inputSet.sortNodesByInputType(members)
+
+
+def caseBobify(n, data_dir):
+    """Bobifies n cameras, all of the same type."""
+    ati.compounds.ensureLib()
+    cameras = [SCENE.createShape("camera", f"camera{x}").name for x in range(n)]
+    return lambda: ati.bobify.bobifyNodes(cameras)
+
+
+def caseBobifyTypes(n, data_dir):
+    """Bobifies one node for each of n types with saved signatures, so no prototype can be reused."""
+    ati.compounds.ensureLib()
+    nodes = [SCENE.createNode(node_type).name for node_type in defineSignatureTypes(n)]
+    return lambda: ati.bobify.bobifyNodes(nodes, replace_transforms=False)
+
+
+def caseAutoSignature(n, data_dir):
+    """Generates auto signatures for n node types, nothing cached."""
+    node_types = defineSignatureTypes(n, save=False)
+    return lambda: [ati.signature.autoSignature(node_type, use_cache=False) for node_type in node_types]
+
+
+def caseAutoSignatureCached(n, data_dir):
+    """Same as autoSignature, but every type's result is already cached on disk."""
+    node_types = defineSignatureTypes(n, save=False)
+    [ati.signature.autoSignature(node_type) for node_type in node_types]
+    return lambda: [ati.signature.autoSignature(node_type) for node_type in node_types]
+
+
+def casePublish(n, data_dir):
+    """Publishes make/break compounds for n signatures in one PublishBatch."""
+    node_types = defineSignatureTypes(n)
+
+    def publish():
+        with ati.compounds.PublishBatch():
+            for node_type in node_types:
+                ati.compounds.requestPublish(node_type)
+
+    return publish
+
+
+CASES = {  # name: (case, "members" or "signatures" sizes)
+    "update_full": (caseUpdateFull, "members"),
+    "update_rescan": (caseUpdateRescan, "members"),
+    "update_delta": (caseUpdateDelta, "members"),
+    "update_rebuild": (caseUpdateRebuild, "members"),
+    "sort": (caseSort, "members"),
+    "bobify": (caseBobify, "bobify"),
+    "bobify_types": (caseBobifyTypes, "signatures"),
+    "auto_signature": (caseAutoSignature, "signatures"),
+    "auto_signature_cached": (caseAutoSignatureCached, "signatures"),
+    "publish": (casePublish, "signatures"),
+}
+
+
+# Run ==================================================================================================================
+def measure(case, size, data_dir) -> dict:
+    newScene(data_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        func = case(size, data_dir)
+        fakeMaya.RECORDER.reset()
+        start = time.perf_counter()
+        func()
+        wall = time.perf_counter() - start
+
+    result = fakeMaya.RECORDER.snapshot()
+    result.update(size=size, wall_seconds=wall, commands=result["cmds"] + result["mel"])
+    return result
+
+
+def exponent(sizes, values):
+    """Least squares slope of log(value) over log(size), None if it can't be computed."""
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if value > 0]
+    if len(points) < 2 or len({x for x, _y in points}) < 2:
+        return None
+    mean_x = sum(x for x, _y in points) / len(points)
+    mean_y = sum(y for _x, y in points) / len(points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x, _y in points)
+
+
+def runCase(name, sizes, data_dir) -> dict:
+    case, _kind = CASES[name]
+    runs = [measure(case, size, data_dir) for size in sizes]
+    return {
+        "runs": runs,
+        "exponents": {key: exponent(sizes, [run[key] for run in runs]) for key in ("commands", "api", "wall_seconds", "modelled_seconds")},
+    }
+
+
+def formatExponent(value):
+    return "  -  " if value is None else f"{value:5.2f}"
+
+
+def printResults(results):
+    print(f"{'case':<22}{'size':>7}{'cmds':>9}{'mel':>9}{'api':>10}{'wall ms':>10}{'maya ms':>10}")
+    for name, result in results.items():
+        for run in result["runs"]:
+            print(f"{name:<22}{run['size']:>7}{run['cmds']:>9}{run['mel']:>9}{run['api']:>10}"
+                  f"{run['wall_seconds'] * 1000:>10.1f}{run['modelled_seconds'] * 1000:>10.1f}")
+        exps = result["exponents"]
+        print(f"{'':<22}{'exp':>7}{formatExponent(exps['commands']):>18}{formatExponent(exps['api']):>10}"
+              f"{formatExponent(exps['wall_seconds']):>10}{formatExponent(exps['modelled_seconds']):>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the scaling benchmarks against the offline Maya stand-in.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="set member counts")
+    parser.add_argument("--bobify-sizes", nargs="+", type=int, default=BOBIFY_SIZES, help="node counts for bobify")
+    parser.add_argument("--signatures", nargs="+", type=int, default=SIGNATURE_SIZES, help="signature counts")
+    parser.add_argument("--json", help="file to write the full results to, including per command counts")
+    args = parser.parse_args(argv)
+
+    sizes = {"members": args.sizes, "bobify": args.bobify_sizes, "signatures": args.signatures}
+    data_dir = tempfile.mkdtemp(prefix="ati_bench_")
+    try:
+        results = {}
+        for name in args.cases:
+            results[name] = runCase(name, sizes[CASES[name][1]], f"{data_dir}/userdata")
+            printResults({name: results[name]})
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=4)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1219 @@
+"""
+Offline stand-in for the parts of maya.cmds, maya.mel and maya.api.OpenMaya that this package uses.
+Every call is counted and charged a modelled latency (see LATENCY), so command counts and their scaling can be
+measured without a licensed Maya. It models just enough of a scene for the package's code paths to run: nodes,
+DAG parenting, attrs, connections, set membership and Bifrost graph nodes/ports. It is not a Maya emulator.
+
+    import fakeMaya
+    scene = fakeMaya.install()  # must run before the package is imported
+"""
+
+import os, sys, json, shlex, types, fnmatch
+from itertools import count
+
+"""
+Modelled seconds per call. A cmds call costs the "cmds" round trip plus its command's own cost, a command inside
+a mel.eval batch only costs its own cost, since the batch pays one round trip. OpenMaya calls cost "api".
+Rough figures from an interactive session, only their ratios matter for comparing code paths.
+"""
+LATENCY = {
+    "cmds": 30e-6,
+    "api": 3e-6,
+    "mel.eval": 50e-6,
+    "createNode": 150e-6,
+    "delete": 150e-6,
+    "duplicate": 400e-6,
+    "rename": 50e-6,
+    "connectAttr": 40e-6,
+    "removeMultiInstance": 40e-6,
+    "listConnections": 20e-6,
+    "vnnCompound": 400e-6,
+    "vnnNode": 150e-6,
+    "vnnConnect": 200e-6,
+    "MDGModifier.doIt": 15e-6,  # per queued change
+}
+
+BASE_ATTRS = {"message": ("message", False, False, None)}  # attr: (attr type, is multi, is worldspace, parent)
+DAG_ATTRS = {
+    "worldMatrix": ("matrix", True, True, None),
+    "visibility": ("bool", False, False, None),
+    "intermediateObject": ("bool", False, False, None),
+    "instObjGroups": ("compound", True, True, None),
+}
+SHAPE_TYPES = {"mesh", "nurbsCurve", "locator", "camera", "bifrostGraphShape", "nParticle"}
+NODE_TYPES = {}  # node type: NodeType, see defineType
+PORT_TO_ATTR_TYPE = {"float": "double", "long": "long", "bool": "bool", "string": "string", "uint": "enum",
+                     "Object": "bifData", "Math::float3": "double3", "Math::float4x4": "matrix"}
+FLAG_ARITY = {"f": 0, "createOutputPort": 2, "createInputPort": 2, "spv": 2, "spt": 2, "spm": 3, "setPortDataType": 2}
+
+
+class Recorder:
+    """
+    Counts calls per surface (cmds, mel, api) and command, and sums their modelled latency.
+    """
+
+    def __init__(self):
+        self.calls = {}  # "surface.command": count
+        self.modelled = 0.0
+        self.listeners = []  # called with (surface, command) for every recorded call
+
+    def reset(self):
+        self.calls = {}
+        self.modelled = 0.0
+
+    def record(self, surface, command, cost):
+        key = f"{surface}.{command}"
+        self.calls[key] = self.calls.get(key, 0) + 1
+        self.modelled += cost
+        for listener in self.listeners:
+            listener(surface, command)
+
+    def total(self, surface=None) -> int:
+        if surface is None:
+            return sum(self.calls.values())
+        return sum(n for key, n in self.calls.items() if key.startswith(surface + "."))
+
+    def snapshot(self) -> dict:
+        return {
+            "cmds": self.total("cmds"),
+            "mel": self.total("mel"),
+            "api": self.total("api"),
+            "modelled_seconds": self.modelled,
+            "calls": dict(sorted(self.calls.items(), key=lambda item: -item[1])),
+        }
+
+
+RECORDER = Recorder()
+
+
+def recordApi(name):
+    RECORDER.record("api", name, LATENCY["api"] + LATENCY.get(name, 0))
+
+
+# Scene ================================================================================================================
+class NodeType:
+    def __init__(self, name, attrs=None, dag=False, inherits=(), plugin=None, shape=None):
+        self.name = name
+        self.attrs = dict(BASE_ATTRS)
+        self.dag = dag
+        if dag:
+            self.attrs.update(DAG_ATTRS)
+        self.attrs.update(attrs or {})
+        self.inherits = (name,) + tuple(inherits)
+        self.plugin = plugin
+        self.shape = name in SHAPE_TYPES if shape is None else shape
+
+
+def defineType(name, attrs=None, dag=False, inherits=(), plugin=None, shape=None) -> NodeType:
+    """
+    Registers a node type. attrs is {attr: attr type or (attr type, is multi, is worldspace, parent)}.
+    """
+    attrs = {attr: ((info,) if isinstance(info, str) else tuple(info)) for attr, info in (attrs or {}).items()}
+    attrs = {attr: info + (False, False, None)[len(info) - 1:] for attr, info in attrs.items()}
+    NODE_TYPES[name] = NodeType(name, attrs, dag, inherits, plugin, shape)
+    return NODE_TYPES[name]
+
+
+def defineDefaultTypes():
+    defineType("transform", {
+        "translate": "double3", "translateX": ("doubleLinear", False, False, "translate"),
+        "translateY": ("doubleLinear", False, False, "translate"), "translateZ": ("doubleLinear", False, False, "translate"),
+        "rotate": "double3", "scale": "double3",
+    }, dag=True)
+    defineType("joint", {"translate": "double3", "rotate": "double3", "jointOrient": "double3"}, dag=True, inherits=("transform",))
+    defineType("locator", {"localPosition": "double3", "localScale": "double3"}, dag=True)
+    defineType("mesh", {"inMesh": "mesh", "outMesh": "mesh", "worldMesh": ("mesh", True, True)}, dag=True)
+    defineType("nurbsCurve", {"create": "nurbsCurve", "local": "nurbsCurve", "worldSpace": ("nurbsCurve", True, True)}, dag=True)
+    defineType("camera", {
+        "nearClipPlane": "doubleLinear", "farClipPlane": "doubleLinear", "focalLength": "double", "overscan": "double",
+        "focusDistance": "doubleLinear", "cameraAperture": "double2", "orthographic": "bool", "orthographicWidth": "doubleLinear",
+        "ovrgb": "float3",
+    }, dag=True)
+    defineType("objectSet", {"dagSetMembers": ("message", True, False), "dnSetMembers": ("message", True, False)})
+    # ports added by scripts/objectSet_graph.mel and objectSet_typeBobs.mel, which the fake does not run
+    defineType("bifrostGraphShape", {
+        "meshes": ("mesh", True), "strands": ("nurbsCurve", True), "transforms": ("matrix", True),
+        "bobs": ("bifData", True), "type_bobs": ("bifData", True), "object_set": "bifData",
+    }, dag=True, plugin="bifrostGraph")
+    defineType("bifrostBoard", plugin="bifrostGraph")
+    defineType("script")
+
+
+class Node:
+    def __init__(self, scene, name, node_type: NodeType, parent=None):
+        self.scene = scene
+        self.name = name
+        self.type = node_type
+        self.parent = parent
+        self.children = []
+        self.attrs = {}  # dynamic attr: (attr type, is multi, is worldspace, parent)
+        self.values = {}  # plug attr: value
+        self.elements = {}  # multi attr: {indices}
+        self.inputs = {}  # dst attr: (src node, src attr)
+        self.outputs = {}  # src attr: {(dst node, dst attr): None}
+        self.intermediate = False
+        self.alive = True
+        self.hash = next(scene.hashes)
+        self.vnn = VnnGraph() if node_type.name in ("bifrostGraphShape", "bifrostBoard") else None
+        if parent is not None:
+            parent.children.append(self)
+
+    def __repr__(self):
+        return f"<Node {self.longName()}>"
+
+    def longName(self):
+        if not self.type.dag:
+            return self.name
+        path = []
+        node = self
+        while node is not None:
+            path.append(node.name)
+            node = node.parent
+        return "|" + "|".join(reversed(path))
+
+    def attrInfo(self, attr):
+        attr = attr.split("[", 1)[0].rsplit(".", 1)[-1]
+        return self.attrs.get(attr) or self.type.attrs.get(attr)
+
+    def hasAttr(self, attr):
+        return self.attrInfo(attr) is not None
+
+
+class Scene:
+    """
+    All nodes, by name. Short names are kept unique so any DAG path resolves by its last component.
+    """
+
+    def __init__(self):
+        self.hashes = count(1)
+        self.callback_ids = count(1)
+        self.clear()
+
+    def clear(self):
+        """Same as a new scene, callbacks on nodes are dropped, global ones are kept."""
+        callbacks = getattr(self, "callbacks", {})
+        for kind, watched, function in list(callbacks.values()):
+            if kind == f"scene{MSceneMessage.kBeforeNew}":
+                function(None)
+        self.nodes = {}
+        self.selection = []
+        self.deferred = []
+        self.callbacks = {key: callback for key, callback in callbacks.items() if callback[1] is None}  # id: (kind, node or None, function)
+        self.plugins = {"bifrostGraph": "2.7.0.0"}
+        self.published = {}  # compound name: [ports]
+        self.warnings = []
+        self.mel_failed = []
+
+    # names and lookup
+    def uniqueName(self, name):
+        if name not in self.nodes:
+            return name
+        base = name.rstrip("0123456789")
+        x = 1
+        while f"{base}{x}" in self.nodes:
+            x += 1
+        return f"{base}{x}"
+
+    def find(self, name) -> Node | None:
+        if isinstance(name, Node):
+            return name if name.alive else None
+        return self.nodes.get(str(name).rsplit("|", 1)[-1])
+
+    def get(self, name) -> Node:
+        node = self.find(name)
+        if node is None:
+            raise ValueError(f"No object matches name: {name}")
+        return node
+
+    def plug(self, plug) -> tuple[Node, str]:
+        name, attr = str(plug).split(".", 1)
+        return self.get(name), attr
+
+    # building
+    def createNode(self, node_type, name=None, parent=None) -> Node:
+        if node_type not in NODE_TYPES:
+            raise RuntimeError(f"Unknown object type: {node_type}")
+        _type = NODE_TYPES[node_type]
+        parent = self.find(parent) if parent is not None else None
+        if _type.dag and _type.shape and parent is None:
+            parent = self.createNode("transform", self.uniqueName(f"{name or node_type}_transform1"))
+        node = Node(self, self.uniqueName(name or f"{node_type}1"), _type, parent)
+        self.nodes[node.name] = node
+        for kind, watched, function in list(self.callbacks.values()):
+            if kind == "nodeAdded":
+                function(MObject(node), None)
+        return node
+
+    def createShape(self, node_type, name) -> Node:
+        """Creates a transform with a shape under it, named name and nameShape, returns the transform."""
+        transform = self.createNode("transform", name)
+        self.createNode(node_type, f"{transform.name}Shape", parent=transform)
+        return transform
+
+    def rename(self, node, name) -> str:
+        node = self.get(node)
+        del self.nodes[node.name]
+        node.name = self.uniqueName(name)
+        self.nodes[node.name] = node
+        for kind, watched, function in list(self.callbacks.values()):
+            if kind == "nameChanged" and watched is node:
+                function(MObject(node), "", None)
+        return node.name
+
+    def delete(self, node):
+        node = self.find(node)
+        if node is None:
+            return
+        for child in list(node.children):
+            self.delete(child)
+        for kind, watched, function in list(self.callbacks.values()):
+            if kind == "nodeRemoved":
+                function(MObject(node), None)
+        for dst_attr in list(node.inputs):
+            self.disconnect(node, dst_attr)
+        for src_attr, dsts in list(node.outputs.items()):
+            for dst_node, dst_attr in list(dsts):
+                self.disconnect(dst_node, dst_attr)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.alive = False
+        del self.nodes[node.name]
+
+    # connections
+    def connect(self, src, dst, force=True):
+        src_node, src_attr = self.plug(src) if isinstance(src, str) else src
+        dst_node, dst_attr = self.plug(dst) if isinstance(dst, str) else dst
+        if dst_attr in dst_node.inputs:
+            if dst_node.inputs[dst_attr] == (src_node, src_attr):
+                return
+            if not force:
+                raise RuntimeError(f"{dst_node.name}.{dst_attr} already has an incoming connection")
+            self.disconnect(dst_node, dst_attr)
+        dst_node.inputs[dst_attr] = (src_node, src_attr)
+        src_node.outputs.setdefault(src_attr, {})[(dst_node, dst_attr)] = None
+        if dst_attr.endswith("]"):
+            attr, index = dst_attr[:-1].rsplit("[", 1)
+            dst_node.elements.setdefault(attr, set()).add(int(index))
+        self.connectionChanged(src_node, src_attr, dst_node, dst_attr, True)
+
+    def disconnect(self, dst_node, dst_attr):
+        src = dst_node.inputs.pop(dst_attr, None)
+        if src is None:
+            return
+        src_node, src_attr = src
+        src_node.outputs.get(src_attr, {}).pop((dst_node, dst_attr), None)
+        if not src_node.outputs.get(src_attr, True):
+            del src_node.outputs[src_attr]
+        self.connectionChanged(src_node, src_attr, dst_node, dst_attr, False)
+
+    def connectionChanged(self, src_node, src_attr, dst_node, dst_attr, made):
+        for kind, watched, function in list(self.callbacks.values()):
+            if kind == "connection":
+                function(MPlug(src_node, src_attr), MPlug(dst_node, dst_attr), made, None)
+            elif kind == "setMembers" and watched is dst_node and dst_attr.split("[", 1)[0] in ("dagSetMembers", "dnSetMembers"):
+                function(MObject(dst_node), None)
+
+    def removeElement(self, node, attr, index):
+        self.disconnect(node, f"{attr}[{index}]")
+        node.elements.get(attr, set()).discard(index)
+
+    def multiIndices(self, node, attr) -> list[int]:
+        return sorted(node.elements.get(attr, ()))
+
+    # sets
+    def createSet(self, name, members=()) -> Node:
+        object_set = self.createNode("objectSet", name)
+        self.addMembers(object_set, members)
+        return object_set
+
+    def addMembers(self, object_set, members):
+        object_set = self.get(object_set)
+        for member in members:
+            member = self.get(member)
+            if member.type.dag:
+                index = max(self.multiIndices(object_set, "dagSetMembers"), default=-1) + 1
+                self.connect((member, f"instObjGroups[{index}]"), (object_set, f"dagSetMembers[{index}]"))
+            else:
+                index = max(self.multiIndices(object_set, "dnSetMembers"), default=-1) + 1
+                self.connect((member, "message"), (object_set, f"dnSetMembers[{index}]"))
+
+    def removeMembers(self, object_set, members):
+        object_set = self.get(object_set)
+        members = {self.get(member) for member in members}
+        for attr in ("dagSetMembers", "dnSetMembers"):
+            for index in self.multiIndices(object_set, attr):
+                src = object_set.inputs.get(f"{attr}[{index}]")
+                if src is not None and src[0] in members:
+                    self.removeElement(object_set, attr, index)
+
+    def setMembers(self, object_set) -> list[Node]:
+        object_set = self.get(object_set)
+        return [src[0] for attr, src in object_set.inputs.items() if attr.split("[", 1)[0] in ("dagSetMembers", "dnSetMembers")]
+
+    def flushDeferred(self):
+        """Runs evalDeferred callables, as Maya would when idle."""
+        while self.deferred:
+            function = self.deferred.pop(0)
+            function() if callable(function) else None
+
+
+class VnnGraph:
+    """
+    Nodes and ports inside a Bifrost graph. Node paths are "/name" or "/compound/name".
+    """
+
+    def __init__(self):
+        self.nodes = {"/input": [], "/output": []}  # node path: [port names], in creation order
+        self.compounds = {"/"}
+        self.types = {}  # (node path, port): port type
+        self.values = {}  # (node path, port): value
+        self.edges = []  # [(src "path.port", dst "path.port")]
+
+    def copy(self):
+        graph = VnnGraph()
+        graph.nodes = {path: list(ports) for path, ports in self.nodes.items()}
+        graph.compounds = set(self.compounds)
+        graph.types = dict(self.types)
+        graph.values = dict(self.values)
+        graph.edges = list(self.edges)
+        return graph
+
+    def children(self, path) -> list[str]:
+        prefix = path.rstrip("/") + "/"
+        names = [p[len(prefix):] for p in list(self.nodes) + list(self.compounds) if p.startswith(prefix)]
+        return list({name: None for name in names if name and "/" not in name})
+
+    def ports(self, path) -> list[str]:
+        if path in self.compounds and path != "/":
+            return self.nodes.get(f"{path}/input", []) + self.nodes.get(f"{path}/output", [])
+        return self.nodes.get(path, [])
+
+    def addNode(self, path, name, ports=()):
+        parent = path.rstrip("/")
+        names = set(self.children(path))
+        node_name, x = name, 0
+        while node_name in names:
+            x += 1
+            node_name = f"{name}{x}"
+        self.nodes[f"{parent}/{node_name}"] = list(ports)
+        return node_name
+
+    def addCompound(self, path, name):
+        node_path = f"{path.rstrip('/')}/{name}"
+        self.compounds.add(node_path)
+        self.nodes[f"{node_path}/input"] = []
+        self.nodes[f"{node_path}/output"] = []
+        return node_path
+
+    def addPort(self, path, name, port_type):
+        ports = self.nodes.setdefault(path, [])
+        port, x = name, 0
+        while port in ports:
+            x += 1
+            port = f"{name}{x}"
+        ports.append(port)
+        self.types[(path, port)] = port_type
+        return port
+
+    def moveNodesIn(self, path, name, moved):
+        """Creates a compound from nodes, edges crossing its boundary become its ports."""
+        parent = path.rstrip("/")
+        compound = self.addCompound(path, name)
+        moved = {f"{parent}/{node}" for node in moved}
+        for node in moved:
+            self.nodes[f"{compound}/{node.rsplit('/', 1)[-1]}"] = self.nodes.pop(node)
+
+        def inside(plug):
+            return plug.rsplit(".", 1)[0] in moved
+
+        def relocate(plug):
+            node, port = plug.rsplit(".", 1)
+            return f"{compound}/{node.rsplit('/', 1)[-1]}.{port}"
+
+        edges = []
+        for src, dst in self.edges:
+            if inside(src) and inside(dst):
+                edges.append((relocate(src), relocate(dst)))
+            elif inside(dst):
+                port = self.addPort(f"{compound}/input", src.rsplit(".", 1)[-1], self.types.get(tuple(src.rsplit(".", 1))))
+                edges += [(src, f"{compound}.{port}"), (f"{compound}/input.{port}", relocate(dst))]
+            elif inside(src):
+                port = self.addPort(f"{compound}/output", dst.rsplit(".", 1)[-1], "Object")
+                edges += [(relocate(src), f"{compound}/output.{port}"), (f"{compound}.{port}", dst)]
+            else:
+                edges.append((src, dst))
+        self.edges = edges
+
+
+SCENE = Scene()
+
+
+# maya.cmds ============================================================================================================
+def flag(flags, *names, default=True):
+    """Returns the first of the short/long flag names that was given, ie. s or source."""
+    for name in names:
+        if flags.get(name) is not None:
+            return flags[name]
+    return default
+
+
+def asList(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def isType(node, types):
+    return any(t in node.type.inherits for t in asList(types))
+
+
+def plugElements(node, attr):
+    """Yields (dst attr) of node's inputs which belong to attr, ie. attr, attr[0], attr[1].x"""
+    for dst_attr in list(node.inputs):
+        if dst_attr == attr or dst_attr.startswith(attr + "[") or dst_attr.startswith(attr + "."):
+            yield dst_attr
+
+
+class Commands:
+    """
+    Implementations of the maya.cmds used by the package, with the same args and flags.
+    """
+
+    def __init__(self, scene: Scene):
+        self.scene = scene
+
+    # nodes
+    def createNode(self, node_type, n=None, name=None, p=None, parent=None, ss=False, skipSelect=False):
+        return self.scene.createNode(node_type, n or name, p or parent).name
+
+    def rename(self, node, name):
+        return self.scene.rename(node, name)
+
+    def delete(self, *nodes, **flags):
+        for node in [n for arg in nodes for n in asList(arg)]:
+            self.scene.delete(node)
+
+    def duplicate(self, node, name=None, n=None, **flags):
+        scene = self.scene
+        src = scene.get(node)
+        dup = scene.createNode(src.type.name, name or n or src.name, src.parent)
+        dup.attrs = dict(src.attrs)
+        dup.values = dict(src.values)
+        dup.elements = {attr: set(indices) for attr, indices in src.elements.items()}
+        if src.vnn is not None:
+            dup.vnn = src.vnn.copy()
+        return [dup.name]
+
+    def objExists(self, name):
+        if "." in name:
+            node_name, attr = name.split(".", 1)
+            node = self.scene.find(node_name)
+            return node is not None and node.hasAttr(attr)
+        return self.scene.find(name) is not None
+
+    def nodeType(self, node, inherited=False, i=False):
+        node = self.scene.get(node)
+        return list(reversed(node.type.inherits)) if inherited or i else node.type.name
+
+    def ls(self, *names, type=None, typ=None, sl=False, selection=False, recursive=False, long=False, l=False, **flags):
+        scene = self.scene
+        types = type or typ
+        if sl or selection:
+            nodes = [scene.find(name) for name in scene.selection]
+        elif not names:
+            nodes = list(scene.nodes.values())
+        else:
+            nodes = []
+            for pattern in [name for arg in names for name in asList(arg)]:
+                if "." in pattern and not ("*" in pattern or "?" in pattern):  # plug, ie. |pCube1|pCubeShape1.worldMesh[0]
+                    node_name, attr = pattern.split(".", 1)
+                    node = scene.find(node_name)
+                    if node is not None and node.hasAttr(attr):
+                        nodes.append(pattern)
+                elif "." in pattern:  # plug pattern, ie. *.inputSet
+                    node_pattern, attr = pattern.split(".", 1)
+                    nodes.extend(f"{node.name}.{attr}" for node in scene.nodes.values()
+                                 if fnmatch.fnmatchcase(node.name, node_pattern) and node.hasAttr(attr))
+                elif "*" in pattern or "?" in pattern:
+                    nodes.extend(node for node in scene.nodes.values() if fnmatch.fnmatchcase(node.name, pattern))
+                else:
+                    node = scene.find(pattern)
+                    if node is not None:
+                        nodes.append(node)
+        result = []
+        for node in nodes:
+            if isinstance(node, str):
+                result.append(node)
+            elif node is not None and (types is None or isType(node, types)):
+                result.append(node.longName() if long or l else node.name)
+        return result
+
+    def select(self, *nodes, **flags):
+        self.scene.selection = [n for arg in nodes for n in asList(arg)]
+
+    def listRelatives(self, node, parent=False, p=False, shapes=False, s=False, children=False, c=False,
+                      fullPath=False, f=False, ni=False, noIntermediate=False, **flags):
+        nodes = []
+        for node in [self.scene.get(name) for name in asList(node)]:
+            if parent or p:
+                nodes.extend([node.parent] if node.parent is not None else [])
+            else:
+                nodes.extend(child for child in node.children if not (shapes or s) or child.type.shape)
+        if ni or noIntermediate:
+            nodes = [child for child in nodes if not child.intermediate]
+        if not nodes:
+            return None
+        return [n.longName() if fullPath or f else n.name for n in nodes]
+
+    # attrs
+    def addAttr(self, node, ln=None, longName=None, at=None, attributeType=None, dt=None, dataType=None,
+                multi=False, m=False, **flags):
+        node = self.scene.get(node)
+        attr = ln or longName
+        if node.hasAttr(attr):
+            raise RuntimeError(f"Found an attribute with the same name: {attr}")
+        node.attrs[attr] = (at or attributeType or dt or dataType, multi or m, False, None)
+
+    def setAttr(self, plug, *values, type=None, **flags):
+        node, attr = self.scene.plug(plug)
+        node.values[attr] = values[0] if len(values) == 1 else values
+        if attr.endswith("]"):
+            base, index = attr[:-1].rsplit("[", 1)
+            node.elements.setdefault(base, set()).add(int(index))
+
+    def getAttr(self, plug, type=False, size=False, multiIndices=False, mi=False, **flags):
+        node, attr = self.scene.plug(plug)
+        if type:
+            info = node.attrInfo(attr)
+            if info is None:
+                raise ValueError(f"No object matches name: {plug}")
+            return info[0]
+        if size:
+            return len(self.scene.multiIndices(node, attr))
+        if multiIndices or mi:
+            return self.scene.multiIndices(node, attr) or None
+        return node.values.get(attr)
+
+    def listAttr(self, node, userDefined=False, ud=False, read=False, r=False, visible=False, v=False,
+                 fp=False, fromPlugin=False, **flags):
+        node = self.scene.get(node)
+        if userDefined or ud:
+            return list(node.attrs) or None
+        if fp or fromPlugin:
+            return None
+        attrs = list(node.type.attrs) + list(node.attrs)
+        return [attr for attr in attrs if attr not in ("message", "instObjGroups")] or None
+
+    def attributeInfo(self, node=None, type=None, t=None, allAttributes=False, all=False, short=False, s=False,
+                      multi=False, m=False, **flags):
+        """The fake has no short names, so short lists the long ones."""
+        attrs = NODE_TYPES[type or t].attrs if type or t else self.scene.get(node).type.attrs
+        return [attr for attr, info in attrs.items() if info[1] or not (multi or m)]
+
+    def attributeQuery(self, attr, type=None, typ=None, node=None, n=None, exists=False, ex=False, m=False, multi=False,
+                       listParent=False, lp=False, worldspace=False, ws=False, **flags):
+        if type or typ:
+            info = NODE_TYPES[type or typ].attrs.get(attr)
+        else:
+            info = self.scene.get(node or n).attrInfo(attr)
+        if exists or ex:
+            return info is not None
+        if info is None:
+            raise RuntimeError(f"Attribute not found: {attr}")
+        if m or multi:
+            return info[1]
+        if worldspace or ws:
+            return info[2]
+        if listParent or lp:
+            return [info[3]] if info[3] else None
+        return None
+
+    def connectAttr(self, src, dst, f=False, force=False, **flags):
+        self.scene.connect(src, dst, force=f or force)
+
+    def disconnectAttr(self, src, dst):
+        self.scene.disconnect(*self.scene.plug(dst))
+
+    def removeMultiInstance(self, plug, b=False, **flags):
+        node, attr = self.scene.plug(plug)
+        attr, index = attr[:-1].rsplit("[", 1)
+        if index == "*":
+            for x in self.scene.multiIndices(node, attr)[:1]:
+                self.scene.removeElement(node, attr, x)
+        else:
+            self.scene.removeElement(node, attr, int(index))
+
+    def listConnections(self, target=None, s=None, source=None, d=None, destination=None, p=False, plugs=False,
+                        c=False, connections=False, type=None, t=None, **flags):
+        scene = self.scene
+        source = flag(dict(s=s, source=source), "s", "source")
+        destination = flag(dict(d=d, destination=destination), "d", "destination")
+        plugs, connections, types = p or plugs, c or connections, type or t
+
+        result = []
+        for item in asList(target):
+            node_name, _, attr = item.partition(".")
+            node = scene.find(node_name)
+            if node is None:
+                continue
+
+            pairs = []  # (own plug, other node, other attr)
+            if source:
+                attrs = plugElements(node, attr) if attr else list(node.inputs)
+                pairs += [(dst_attr, *node.inputs[dst_attr]) for dst_attr in attrs]
+            if destination:
+                for src_attr, dsts in list(node.outputs.items()):
+                    if not attr or src_attr == attr or src_attr.startswith(attr + "["):
+                        pairs += [(src_attr, dst_node, dst_attr) for dst_node, dst_attr in dsts]
+
+            for own_attr, other, other_attr in pairs:
+                if types is not None and not isType(other, types):
+                    continue
+                if connections:
+                    result.append(f"{node.name}.{own_attr}")
+                result.append(f"{other.name}.{other_attr}" if plugs else other.name)
+
+        return result or None
+
+    def sets(self, *nodes, e=False, edit=False, forceElement=None, fe=None, add=None, remove=None, **flags):
+        if add:
+            self.scene.addMembers(add, [n for arg in nodes for n in asList(arg)])
+        elif remove:
+            self.scene.removeMembers(remove, [n for arg in nodes for n in asList(arg)])
+
+    # bifrost
+    def vnn(self, lib=None, nd=None, **flags):
+        if lib is not None:
+            return ["Core", "Diagnostic"] + (["ATI"] if self.scene.published else [])
+        if nd is not None:
+            return list(self.scene.published)
+        return None
+
+    def vnnCompound(self, graph, path, **flags):
+        vnn = self.scene.get(graph).vnn
+        if "addNode" in flags:
+            _lib, namespace, name = flags["addNode"].split(",")
+            return [vnn.addNode(path, name, self.scene.published.get(name, ()))]
+        if "create" in flags:
+            moved = asList(flags.get("moveNodeIn"))
+            if moved:
+                vnn.moveNodesIn(path, flags["create"], moved)
+            else:
+                vnn.addCompound(path, flags["create"])
+            return [flags["create"]]
+        if flags.get("listNodes") or flags.get("ln"):
+            return vnn.children(path)
+        if "publish" in flags:
+            filename, namespace, name, _ = flags["publish"]
+            self.scene.published[name] = vnn.ports(path)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, "w") as file:
+                json.dump({"compounds": [name]}, file)
+            return None
+        if "renamePort" in flags:
+            old, new = flags["renamePort"]
+            for node in (f"{path}/input", f"{path}/output"):
+                ports = vnn.nodes.get(node, [])
+                if old in ports:
+                    ports[ports.index(old)] = new
+            return None
+        if "movePort" in flags:
+            port, index = flags["movePort"]
+            ports = vnn.nodes.get(f"{path}/input", [])
+            if port in ports:
+                ports.remove(port)
+                ports.insert(int(index), port)
+            return None
+        if "deletePort" in flags:
+            port = flags["deletePort"]
+            for node in ("/input", "/output"):
+                if port in vnn.nodes[node]:
+                    vnn.nodes[node].remove(port)
+            self.scene.get(graph).attrs.pop(port, None)
+            return None
+        if "addIONode" in flags:
+            return [vnn.addNode(path, "input" if flags["addIONode"] else "output")]
+        if "rn" in flags:
+            src, dst = flags["rn"]
+            parent = path.rstrip("/")
+            vnn.nodes[f"{parent}/{dst}"] = vnn.nodes.pop(f"{parent}/{src}")
+            return None
+        return None
+
+    def vnnNode(self, graph, path, **flags):
+        graph_node = self.scene.get(graph)
+        vnn = graph_node.vnn
+        for flag_name in ("createOutputPort", "createInputPort"):
+            if flag_name in flags:
+                name, port_type = flags[flag_name]
+                port = vnn.addPort(path, name, port_type)
+                if path in ("/input", "/output"):  # top level ports are Maya attrs of the graph
+                    is_array = port_type.startswith("array<")
+                    attr_type = PORT_TO_ATTR_TYPE.get(port_type.replace("array<", "").rstrip(">"), "bifData")
+                    graph_node.attrs[port] = (attr_type, is_array, False, None)
+                return None
+        if flags.get("lp") or flags.get("listPorts"):
+            name = path.rsplit("/", 1)[-1]
+            return [f"{name}.{port}" for port in vnn.ports(path)]
+        if "spv" in flags:
+            port, value = flags["spv"]
+            vnn.values[(path, port)] = value
+        if "qpv" in flags:
+            return vnn.values.get((path, flags["qpv"]))
+        for flag_name in ("spt", "setPortDataType"):
+            if flag_name in flags:
+                port, port_type = flags[flag_name]
+                vnn.types[(path, port)] = port_type
+        if "qpt" in flags:
+            return vnn.types.get((path, flags["qpt"]), "auto")
+        return None
+
+    def vnnConnect(self, graph, src, dst, **flags):
+        vnn = self.scene.get(graph).vnn
+        vnn.edges.append((src, dst))
+        src_path, src_port = src.rsplit(".", 1)
+        dst_path, dst_port = dst.rsplit(".", 1)
+        if (src_path, src_port) in vnn.types and (dst_path, dst_port) not in vnn.types:
+            vnn.types[(dst_path, dst_port)] = vnn.types[(src_path, src_port)]
+
+    def bifrostGraph(self, graph, **flags):
+        return None
+
+    def vnnCompoundEditor(self, *args, **flags):
+        return None
+
+    # session
+    def about(self, batch=False, b=False, apiVersion=False, api=False, version=False, v=False, **flags):
+        if batch or b:
+            return True
+        if apiVersion or api:
+            return 20240200
+        return "2024"
+
+    def pluginInfo(self, plugin=None, q=False, query=False, listPlugins=False, version=False, dependNode=False, **flags):
+        if listPlugins:
+            return list(self.scene.plugins)
+        if version:
+            return self.scene.plugins.get(plugin)
+        if dependNode:
+            return [name for name, _type in NODE_TYPES.items() if _type.plugin == plugin] or None
+        return None
+
+    def loadPlugin(self, plugin, quiet=False, **flags):
+        self.scene.plugins.setdefault(plugin, "1.0")
+
+    def undoInfo(self, q=False, query=False, **flags):
+        return True if q or query else None
+
+    def evalDeferred(self, function, **flags):
+        self.scene.deferred.append(function)
+
+    def warning(self, message):
+        self.scene.warnings.append(message)
+
+    def scriptNode(self, name=None, **flags):
+        return self.scene.createNode("script", name).name
+
+
+class CmdsModule(types.ModuleType):
+    """
+    maya.cmds, every attribute is a recorded command. Commands without an implementation return None.
+    """
+
+    def __init__(self, commands: Commands):
+        super().__init__("maya.cmds")
+        self._commands = commands
+
+    def __dir__(self):
+        return [name for name in dir(self._commands) if not name.startswith("_") and name != "scene"]
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        implementation = getattr(self._commands, name, None)
+        cost = LATENCY["cmds"] + LATENCY.get(name, 0)
+
+        def command(*args, **flags):
+            RECORDER.record("cmds", name, cost)
+            return implementation(*args, **flags) if implementation is not None else None
+
+        command.__name__ = name
+        return command
+
+
+# maya.mel =============================================================================================================
+def parseMel(statement) -> tuple[str, list, dict] | None:
+    """
+    Parses a single MEL command in the form melBatch.melCommand writes them: command -flag values... args...
+    Repeated flags are collected in a list. Returns None for anything else, ie. variables or source.
+    """
+    try:
+        tokens = shlex.split(statement, posix=True)
+    except ValueError:
+        return None
+    if not tokens or not tokens[0].isidentifier() or tokens[0] in ("string", "global", "source", "int", "clear"):
+        return None
+
+    command, args, flags = tokens[0], [], {}
+    x = 1
+    while x < len(tokens):
+        token = tokens[x]
+        if token.startswith("-") and not token[1:2].isdigit() and len(token) > 1:
+            name = token[1:]
+            arity = FLAG_ARITY.get(name, 1)
+            values = tokens[x + 1:x + 1 + arity]
+            value = True if arity == 0 else values[0] if arity == 1 else tuple(values)
+            if name in flags:
+                flags[name] = asList(flags[name]) + [value]
+            else:
+                flags[name] = value
+            x += 1 + arity
+        else:
+            args.append(token)
+            x += 1
+    return command, args, flags
+
+
+def splitStatements(script) -> list[str]:
+    statements, current, quote = [], "", False
+    for x, char in enumerate(script):
+        if char == '"' and (x == 0 or script[x - 1] != "\\"):
+            quote = not quote
+        if char == ";" and not quote:
+            statements.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+class MelModule(types.ModuleType):
+    """
+    maya.mel, eval runs the commands it recognises against the fake scene and records each of them.
+    """
+
+    def __init__(self, commands: Commands):
+        super().__init__("maya.mel")
+        self._commands = commands
+
+    def runCommand(self, statement):
+        parsed = parseMel(statement)
+        if parsed is None:
+            return None
+        command, args, flags = parsed
+        implementation = getattr(self._commands, command, None)
+        RECORDER.record("mel", command, LATENCY.get(command, 0))
+        return implementation(*args, **flags) if implementation is not None else None
+
+    def eval(self, script):
+        RECORDER.record("cmds", "mel.eval", LATENCY["cmds"] + LATENCY["mel.eval"])
+        scene = self._commands.scene
+        if script.strip() == "melBatchFailed()":
+            return list(scene.mel_failed)
+        if "catchQuiet(`" in script:  # see melBatch.MelBatch.script
+            scene.mel_failed = []
+            for line in script.splitlines():
+                if "catchQuiet(`" not in line:
+                    continue
+                statement = line.split("catchQuiet(`", 1)[1].rsplit("`))", 1)[0]
+                try:
+                    self.runCommand(statement)
+                except Exception:
+                    scene.mel_failed.append(int(line.rsplit("=", 1)[-1].strip(" ;")))
+            return None
+        if script.lstrip().startswith("global proc"):
+            return None
+
+        result = None
+        for statement in splitStatements(script):
+            result = self.runCommand(statement)
+        return result
+
+
+# maya.api.OpenMaya ====================================================================================================
+class MFn:
+    kDagNode = "kDagNode"
+    kSet = "kSet"
+
+
+class MObject:
+    kNullObj = None
+
+    def __init__(self, node: Node = None):
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self.node is other.node
+
+    def __hash__(self):
+        return hash(id(self.node))
+
+    def isNull(self):
+        return self.node is None
+
+    def hasFn(self, fn):
+        recordApi("MObject.hasFn")
+        if fn == MFn.kDagNode:
+            return self.node.type.dag
+        if fn == MFn.kSet:
+            return isType(self.node, "objectSet")
+        return False
+
+
+class MObjectHandle:
+    def __init__(self, mobj: MObject):
+        recordApi("MObjectHandle")
+        self.mobj = mobj
+
+    def hashCode(self):
+        return self.mobj.node.hash
+
+    def isValid(self):
+        return self.mobj.node is not None and self.mobj.node.alive
+
+    def isAlive(self):
+        return self.isValid()
+
+    def object(self):
+        return self.mobj
+
+
+class MDagPath:
+    def __init__(self, other=None):
+        self.node = other.node if other is not None else None
+
+    def fullPathName(self):
+        recordApi("MDagPath.fullPathName")
+        return self.node.longName()
+
+    def numberOfShapesDirectlyBelow(self):
+        recordApi("MDagPath.numberOfShapesDirectlyBelow")
+        return len([child for child in self.node.children if child.type.shape])
+
+    def extendToShape(self, index=0):
+        recordApi("MDagPath.extendToShape")
+        self.node = [child for child in self.node.children if child.type.shape][index]
+        return self
+
+
+class MPlug:
+    def __init__(self, node: Node = None, attr=None):
+        self.node_ = node
+        self.attr = attr
+
+    def name(self):
+        return f"{self.node_.name}.{self.attr}"
+
+    def node(self):
+        return MObject(self.node_)
+
+    def partialName(self, *args, **kwargs):
+        return self.attr
+
+    @property
+    def isDestination(self):
+        return self.attr in self.node_.inputs
+
+    def source(self):
+        src_node, src_attr = self.node_.inputs[self.attr]
+        return MPlug(src_node, src_attr)
+
+    def elementByLogicalIndex(self, index):
+        recordApi("MPlug.elementByLogicalIndex")
+        return MPlug(self.node_, f"{self.attr}[{index}]")
+
+
+class MSelectionList:
+    def __init__(self):
+        self.items = []  # (node, attr or None)
+
+    def add(self, name):
+        recordApi("MSelectionList.add")
+        if isinstance(name, MObject):
+            self.items.append((name.node, None))
+            return self
+        node_name, _, attr = str(name).partition(".")
+        node = SCENE.find(node_name)
+        if node is None:
+            raise RuntimeError(f"(kInvalidParameter): Object does not exist: {name}")
+        self.items.append((node, attr or None))
+        return self
+
+    def clear(self):
+        self.items = []
+
+    def length(self):
+        return len(self.items)
+
+    def getDependNode(self, index):
+        recordApi("MSelectionList.getDependNode")
+        return MObject(self.items[index][0])
+
+    def getDagPath(self, index):
+        recordApi("MSelectionList.getDagPath")
+        node = self.items[index][0]
+        if not node.type.dag:
+            raise TypeError("(kInvalidParameter): Object is not a DAG node")
+        path = MDagPath()
+        path.node = node
+        return path
+
+    def getPlug(self, index):
+        recordApi("MSelectionList.getPlug")
+        node, attr = self.items[index]
+        return MPlug(node, attr)
+
+
+class MFnDependencyNode:
+    def __init__(self, mobj: MObject = None):
+        recordApi("MFnDependencyNode")
+        self.node = mobj.node if mobj is not None else None
+
+    @property
+    def typeName(self):
+        return self.node.type.name
+
+    def name(self):
+        return self.node.name
+
+    def hasAttribute(self, attr):
+        recordApi("MFnDependencyNode.hasAttribute")
+        return self.node.hasAttr(attr)
+
+    def findPlug(self, attr, want_networked=False):
+        recordApi("MFnDependencyNode.findPlug")
+        if not self.node.hasAttr(attr):
+            raise RuntimeError(f"(kInvalidParameter): No such attribute: {attr}")
+        return MPlug(self.node, attr)
+
+
+class MFnDagNode(MFnDependencyNode):
+    def __init__(self, obj=None):
+        recordApi("MFnDagNode")
+        self.node = obj.node if obj is not None else None
+
+    def fullPathName(self):
+        return self.node.longName()
+
+    @property
+    def isIntermediateObject(self):
+        return self.node.intermediate
+
+
+class MFnSet(MFnDependencyNode):
+    def getMembers(self, flatten=False):
+        recordApi("MFnSet.getMembers")
+        sel = MSelectionList()
+        sel.items = [(node, None) for node in SCENE.setMembers(self.node)]
+        return sel
+
+
+class MDGModifier:
+    def __init__(self):
+        self.changes = []
+
+    def connect(self, src: MPlug, dst: MPlug):
+        self.changes.append(("connect", src, dst))
+
+    def disconnect(self, src: MPlug, dst: MPlug):
+        self.changes.append(("disconnect", src, dst))
+
+    def removeMultiInstance(self, plug: MPlug, break_connections=True):
+        self.changes.append(("remove", plug, None))
+
+    def doIt(self):
+        RECORDER.record("api", "MDGModifier.doIt", LATENCY["api"] + LATENCY["MDGModifier.doIt"] * len(self.changes))
+        for change, plug, dst in self.changes:
+            if change == "connect":
+                SCENE.connect((plug.node_, plug.attr), (dst.node_, dst.attr))
+            elif change == "disconnect":
+                SCENE.disconnect(dst.node_, dst.attr)
+            else:
+                attr, index = plug.attr[:-1].rsplit("[", 1)
+                SCENE.removeElement(plug.node_, attr, int(index))
+        self.changes = []
+
+
+def addCallback(kind, node, function):
+    recordApi(f"callback.{kind}")
+    callback_id = next(SCENE.callback_ids)
+    SCENE.callbacks[callback_id] = (kind, node, function)
+    return callback_id
+
+
+class MMessage:
+    @staticmethod
+    def removeCallbacks(ids):
+        for callback_id in ids:
+            SCENE.callbacks.pop(callback_id, None)
+
+    @staticmethod
+    def removeCallback(callback_id):
+        SCENE.callbacks.pop(callback_id, None)
+
+
+class MNodeMessage(MMessage):
+    @staticmethod
+    def addNameChangedCallback(mobj, function, client_data=None):
+        return addCallback("nameChanged", mobj.node, function)
+
+
+class MObjectSetMessage(MMessage):
+    @staticmethod
+    def addSetMembersModifiedCallback(mobj, function, client_data=None):
+        return addCallback("setMembers", mobj.node, function)
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addNodeAddedCallback(function, node_type="dependNode", client_data=None):
+        return addCallback("nodeAdded", None, function)
+
+    @staticmethod
+    def addNodeRemovedCallback(function, node_type="dependNode", client_data=None):
+        return addCallback("nodeRemoved", None, function)
+
+    @staticmethod
+    def addConnectionCallback(function, client_data=None):
+        return addCallback("connection", None, function)
+
+
+class MSceneMessage(MMessage):
+    kBeforeNew, kAfterNew, kBeforeOpen, kAfterOpen, kBeforeImport, kAfterImport = range(6)
+    kBeforeCreateReference, kBeforeLoadReference, kBeforeUnloadReference, kBeforeRemoveReference = range(6, 10)
+
+    @staticmethod
+    def addCallback(message, function, client_data=None):
+        return addCallback(f"scene{message}", None, function)
+
+
+# install ==============================================================================================================
+def install(scene: Scene = None) -> Scene:
+    """
+    Registers the fake maya, maya.cmds, maya.mel and maya.api.OpenMaya modules. Returns the scene they act on.
+    """
+    global SCENE
+    SCENE = scene or SCENE
+    if not NODE_TYPES:
+        defineDefaultTypes()
+
+    commands = Commands(SCENE)
+    maya = types.ModuleType("maya")
+    maya.cmds = CmdsModule(commands)
+    maya.mel = MelModule(commands)
+    maya.api = types.ModuleType("maya.api")
+    maya.api.OpenMaya = types.ModuleType("maya.api.OpenMaya")
+    for cls in (MFn, MObject, MObjectHandle, MDagPath, MPlug, MSelectionList, MFnDependencyNode, MFnDagNode, MFnSet,
+                MDGModifier, MMessage, MNodeMessage, MObjectSetMessage, MDGMessage, MSceneMessage):
+        setattr(maya.api.OpenMaya, cls.__name__, cls)
+
+    sys.modules.update({
+        "maya": maya,
+        "maya.cmds": maya.cmds,
+        "maya.mel": maya.mel,
+        "maya.api": maya.api,
+        "maya.api.OpenMaya": maya.api.OpenMaya,
+    })
+    return SCENE
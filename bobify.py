@@ -3,16 +3,120 @@ Bobifing is the process of constructing a Bifrost object from a Maya node.
 Signatures are used to determine what attributes to include and how to connect them.
 """
 
+import maya.api.OpenMaya as om
 from maya import cmds as mc, mel
 from .packages import bifrostUtils as bif
 from .packages import mayaUtils as mu
-from . import signature
+from .packages import profiler
+from .packages.melBatch import MelBatch
+from . import signature, compounds, inputSet
 
 OUT_PORT_NAME = "bob_output"
 NO_INTERMEDIATE = True
+BY_TYPE = False  # bobifyNodes creates one graph per node type instead of per node, see createTypeBobifyGraph
+USE_COMPOUNDS = True  # use published make_<node_type> compounds when available, see createBobifyGraphFromCompound
+USE_PROTOTYPES = True  # duplicate previously built graphs of the same type, see clonePrototype
+PROTOTYPES = {}  # (node_type, attrs, geo_attr): (prototype graph MObjectHandle, [(src attr, dst port)])
+AUTO_COLLECT = True  # delete bobify graphs when Maya is idle after an InputSet update disconnects their last consumer, see BobifyCollector
+COLLECT_BATCH = 20  # max graphs deleted per idle event
 
 
-def createBobifyGraph(node):
+def createBaseGraph(node):
+    graph = bif.createGraph(f"{node.rsplit('|', 1)[-1]}_bobify", as_board=True)
+    mc.addAttr(graph, ln="bobifySource", at="message")
+    mc.connectAttr(f"{node}.message", f"{graph}.bobifySource")
+    mc.vnnNode(graph, "/output", createInputPort=(OUT_PORT_NAME, "Object"))
+    mc.delete(mc.listConnections(f"{graph}.{OUT_PORT_NAME}", d=True, s=False))
+    return graph
+
+
+@profiler.timed()
+def createBobifyGraphFromCompound(node, sig):
+    """
+    Same result as createBobifyGraph, but using the published make_<node_type> compound as a single node,
+    rather than building a set_property node per attr.
+    Returns None if the compound is missing or does not match the signature.
+    """
+    node_type = sig.node_type
+    make_compound = f"make_{node_type}"
+    if not compounds.isPublished(make_compound):
+        return None
+
+    graph = createBaseGraph(node)
+    make_node = mc.vnnCompound(graph, "/", addNode=f"BifrostGraph,{compounds.NAMESPACE},{make_compound}")[0]
+    make_ports = {port.split(".", 1)[-1] for port in mc.vnnNode(graph, f"/{make_node}", lp=True) or []}
+
+    attrs = list(sig.attrs) if sig.geo_attr is None else [sig.geo_attr] + list(sig.attrs)
+    if node_type not in make_ports or not all(bif.attrToPortName(attr) in make_ports for attr in attrs):
+        mc.delete(graph)  # compound is outdated
+        return None
+
+    with MelBatch() as batch:
+        for attr, new_port in bif.addMayaAttrs(node, attrs, graph, "/input").items():
+            batch.vnnConnect(graph, f"/input.{new_port}", f"/{make_node}.{bif.attrToPortName(attr)}")
+        batch.vnnConnect(graph, f"/{make_node}.{node_type}", f"/output.{OUT_PORT_NAME}")
+
+    return graph
+
+
+def prototypeKey(sig):
+    return sig.node_type, tuple(sig.attrs), sig.geo_attr
+
+
+def recordPrototype(node, sig, graph):
+    """
+    Records graph as the prototype for its signature, along with which of node's attrs feed which port.
+    Graphs with nurbsCurve geo are not recorded, since their port options contain the node's path.
+    """
+    if sig.geo_attr is not None and mc.getAttr(f"{node}.{sig.geo_attr}", type=True) == "nurbsCurve":
+        return
+
+    node = mu.getLongName(node)
+    conns = mc.listConnections(graph, s=True, d=False, c=True, p=True) or []
+    wiring = []
+    for dst, src in zip(conns[0::2], conns[1::2]):
+        src_node, src_attr = src.split(".", 1)
+        dst_attr = dst.split(".", 1)[-1]
+        if dst_attr != "bobifySource" and mu.getLongName(src_node) == node:
+            wiring.append((src_attr, dst_attr))
+
+    PROTOTYPES[prototypeKey(sig)] = (om.MObjectHandle(mu.getMObject(graph)), wiring)
+
+
+@profiler.timed()
+def clonePrototype(node, sig):
+    """
+    Duplicates the recorded prototype graph for the signature and re-points its Maya connections to node.
+    Returns None if there is no prototype.
+    """
+    prototype = PROTOTYPES.get(prototypeKey(sig))
+    if prototype is None:
+        return None
+
+    prototype_graph, wiring = prototype
+    if not prototype_graph.isValid():  # deleted, a renamed prototype is still found
+        del PROTOTYPES[prototypeKey(sig)]
+        return None
+
+    graph = mc.duplicate(mu.getDnName(prototype_graph.object()), name=f"{node.rsplit('|', 1)[-1]}_bobify")[0]
+    if not mc.objExists(f"{graph}.bobifySource"):
+        mc.addAttr(graph, ln="bobifySource", at="message")
+    mc.connectAttr(f"{node}.message", f"{graph}.bobifySource", f=True)
+    for src_attr, dst_attr in wiring:
+        mc.connectAttr(f"{node}.{src_attr}", f"{graph}.{dst_attr}", f=True)
+
+    return graph
+
+
+def clearPrototypes(node_type=None):
+    """Invalidate prototypes of the given node type, or all if None."""
+    for key in list(PROTOTYPES):
+        if node_type is None or key[0] == node_type:
+            del PROTOTYPES[key]
+
+
+@profiler.timed()
+def createBobifyGraph(node, use_compound=None, use_prototype=None):
     """
     Creates a bifrost which constructs a bifrost object from a given node's attributes
     """
@@ -20,62 +124,243 @@ def createBobifyGraph(node):
     if sig.ignore:  # user cancelled
         return
 
+    use_prototype = USE_PROTOTYPES if use_prototype is None else use_prototype
+    if use_prototype:
+        graph = clonePrototype(node, sig)
+        if graph:
+            return graph
+
+    graph = buildBobifyGraph(node, sig, use_compound)
+    if use_prototype:
+        recordPrototype(node, sig, graph)
+    return graph
+
+
+@profiler.timed()
+def buildBobifyGraph(node, sig, use_compound=None):
+    use_compound = USE_COMPOUNDS if use_compound is None else use_compound
+    if use_compound:
+        graph = createBobifyGraphFromCompound(node, sig)
+        if graph:
+            return graph
+
     # Create base graph
-    graph = bif.createGraph(f"{node.rsplit('|', 1)[-1]}_bobify", as_board=True)
-    mc.addAttr(graph, ln="bobifySource", at="message")
-    mc.connectAttr(f"{node}.message", f"{graph}.bobifySource")
-    mc.vnnNode(graph, "/output", createInputPort=(OUT_PORT_NAME, "Object"))
-    mc.delete(mc.listConnections(f"{graph}.{OUT_PORT_NAME}", d=True, s=False))
+    graph = createBaseGraph(node)
+
+    # Add Maya attrs to graph, geo attr last
+    attrs = list(sig.attrs) if sig.geo_attr is None else list(sig.attrs) + [sig.geo_attr]
+    ports = bif.addMayaAttrs(node, attrs, graph, "/input")
+
+    batch = MelBatch()
+    addSetProperties(graph, sig, ports, batch)
+    if batch.flush():
+        # a failed command shifts every predicted node name after it, so the graph is miswired
+        mc.warning(f"Batched build of '{graph}' failed, rebuilding it one command at a time")
+        mc.delete(graph)
+        graph = createBaseGraph(node)
+        ports = bif.addMayaAttrs(node, attrs, graph, "/input")
+        addSetProperties(graph, sig, ports)
+
+    return graph
+
+
+def addSetProperties(graph, sig, ports, batch=None):
+    """
+    Adds the chain of set_property nodes for buildBobifyGraph, one per attr in ports plus the node type.
+    If batch is given, commands are added to it and node names come from bif.nodeNames, since they are only
+    created when the batch is flushed. Otherwise commands run immediately.
+    """
+    cmds = mc if batch is None else batch
+    set_properties = bif.nodeNames("set_property")
+
+    def addSetProperty():
+        if batch is None:
+            return mc.vnnCompound(graph, "/", addNode="BifrostGraph,Core::Object,set_property")[0]
+        batch.vnnCompound(graph, "/", addNode="BifrostGraph,Core::Object,set_property")
+        return next(set_properties)
 
     dst_port = f"/output.{OUT_PORT_NAME}"  # port that the next set_property node will connect to
     for attr in sig.attrs:
-
-        # Add Maya attr to graph
-        new_port = bif.addMayaAttr(node, attr, graph, "/input")
+        new_port = ports.get(attr)
         if not new_port:  # unsupported type
             continue
 
         # Setup set_property node
-        set_property = mc.vnnCompound(graph, "/", addNode="BifrostGraph,Core::Object,set_property")[0]
-        mc.vnnConnect(graph, f"/input.{new_port}",  f"/{set_property}.value")
-        mc.vnnConnect(graph, f"/{set_property}.out_object", dst_port)
+        set_property = addSetProperty()
+        cmds.vnnConnect(graph, f"/input.{new_port}", f"/{set_property}.value")
+        cmds.vnnConnect(graph, f"/{set_property}.out_object", dst_port)
 
         # Property name
-        mc.vnnNode(graph, f"/{set_property}", spv=("key", attr))
+        cmds.vnnNode(graph, f"/{set_property}", spv=("key", attr))
 
         # update destination for next iteration
         dst_port = f"/{set_property}.object"
 
     # add node type property
-    set_property = mc.vnnCompound(graph, "/", addNode="BifrostGraph,Core::Object,set_property")[0]
-    mc.vnnNode(graph, f"/{set_property}", spv=("key", "node_type"))
-    mc.vnnNode(graph, f"/{set_property}", setPortDataType=("value", "string"), spv=("value", sig.p.node_type))
-    mc.vnnConnect(graph, f"/{set_property}.out_object", dst_port)
+    set_property = addSetProperty()
+    cmds.vnnNode(graph, f"/{set_property}", spv=("key", "node_type"))
+    cmds.vnnNode(graph, f"/{set_property}", setPortDataType=("value", "string"), spv=("value", sig.node_type))
+    cmds.vnnConnect(graph, f"/{set_property}.out_object", dst_port)
 
     if sig.geo_attr is not None:  # If applicable, connect geo port (ie mesh port) into the start of the set properties
         dst_port = f"/{set_property}.object"
-        new_port = bif.addMayaAttr(node, sig.geo_attr, graph, "/input")
+        new_port = ports.get(sig.geo_attr)
         if new_port:  # false if unsupported type
-            mc.vnnConnect(graph, f"/input.{new_port}", dst_port)
+            cmds.vnnConnect(graph, f"/input.{new_port}", dst_port)
+
+
+@profiler.timed()
+def createTypeBobifyGraph(nodes: list[str]):
+    """
+    Same as createBobifyGraph, but creates a single graph for many nodes of the same type, outputting array<Object>.
+    Each attr becomes an array port with one connection per node, and the set_property chain auto-loops over them.
+    Multi attrs are not supported unless they are worldspace, in which case the first element is used.
+    Dynamic attrs are only used if every node has them.
+    """
+    sig = signature.prepareSignature(nodes[0])
+    if sig.ignore:  # user cancelled
+        return
+    for node in nodes[1:]:
+        node_attrs = set(signature.prepareSignature(node).attrs)
+        sig = sig.view([attr for attr in sig.attrs if attr in node_attrs])
+
+    # Create base graph
+    graph = bif.createGraph(f"{sig.node_type}_bobify", as_board=True)
+    mc.addAttr(graph, ln="bobifyType", dt="string")
+    mc.setAttr(f"{graph}.bobifyType", sig.node_type, type="string")
+    mc.addAttr(graph, ln="bobifySource", at="message", multi=True)
+    for x, node in enumerate(nodes):
+        mc.connectAttr(f"{node}.message", f"{graph}.bobifySource[{x}]")
+    mc.vnnNode(graph, "/output", createInputPort=(OUT_PORT_NAME, "array<Object>"))
+    mc.delete(mc.listConnections(f"{graph}.{OUT_PORT_NAME}", d=True, s=False))
+
+    def addArrayAttr(attr):
+        info = bif.getAttrInfo(nodes[0], attr, sig.node_type)
+        attr_type = info.attr_type
+        if attr_type not in bif.ATTR_TO_PORT_TYPE:
+            mc.warning(f"Could not add Maya attribute, unsupported type: {sig.node_type}.{attr} -> {attr_type}")
+            return None
+
+        if info.is_multi:
+            if not info.connect_index:
+                mc.warning(f"Could not add Maya attribute, multi attrs are not supported by type: {sig.node_type}.{attr}")
+                return None
+            attr += "[0]"
+
+        port_type = f"array<{bif.ATTR_TO_PORT_TYPE[attr_type]}>"
+        port = bif.createOutputPort(graph, "/input", bif.attrToPortName(attr), port_type)
+        for x, node in enumerate(nodes):
+            mc.connectAttr(f"{node}.{attr}", f"{graph}.{port}[{x}]", f=True)
+        return port
+
+    dst_port = f"/output.{OUT_PORT_NAME}"  # port that the next set_property node will connect to
+    for attr in sig.attrs:
+        new_port = addArrayAttr(attr)
+        if not new_port:  # unsupported type
+            continue
+
+        # Setup set_property node
+        set_property = mc.vnnCompound(graph, "/", addNode="BifrostGraph,Core::Object,set_property")[0]
+        mc.vnnConnect(graph, f"/input.{new_port}", f"/{set_property}.value")
+        mc.vnnConnect(graph, f"/{set_property}.out_object", dst_port)
+        mc.vnnNode(graph, f"/{set_property}", spv=("key", attr))
+        dst_port = f"/{set_property}.object"
+
+    # add node type property
+    set_property = mc.vnnCompound(graph, "/", addNode="BifrostGraph,Core::Object,set_property")[0]
+    mc.vnnNode(graph, f"/{set_property}", spv=("key", "node_type"))
+    mc.vnnNode(graph, f"/{set_property}", setPortDataType=("value", "string"), spv=("value", sig.node_type))
+    mc.vnnConnect(graph, f"/{set_property}.out_object", dst_port)
+
+    if sig.geo_attr is not None:
+        new_port = addArrayAttr(sig.geo_attr)
+        if new_port:
+            mc.vnnConnect(graph, f"/input.{new_port}", f"/{set_property}.object")
 
     return graph
 
 
-def bobifyNodes(nodes: list[str], replace_transforms=True, use_existing=True) -> list[str]:
+def updateTypeBobifyGraph(graph, nodes: list[str]) -> bool:
+    """
+    Rewires a type bobify graph's sources in place, see createTypeBobifyGraph. Every array port is synced like
+    bobifySource, so the same element index maps to the same node on all of them and only the delta is rewired.
+    Returns False, leaving the graph as is, if an added node lacks one of the graph's attrs.
+    """
+    conns = mc.listConnections(graph, s=True, d=False, c=True, p=True) or []
+    ports = {}  # port: src attr
+    for dst, src in zip(conns[0::2], conns[1::2]):
+        ports.setdefault(dst.split(".", 1)[1].split("[", 1)[0], src.split(".", 1)[1])
+
+    current = set(BOBIFY_INDEX.getSources(graph))
+    for node in mu.getLongNames(nodes):
+        if node not in current and not all(mc.objExists(f"{node}.{attr}") for attr in ports.values()):
+            return False
+
+    _changed, nodes = inputSet.syncMultiInput(graph, "bobifySource", "message", nodes)
+    for port, src_attr in ports.items():
+        if port != "bobifySource":
+            inputSet.syncMultiInput(graph, port, src_attr, nodes)
+    return True
+
+
+def getTypeBobifyGraph(nodes: list[str], consumer=None):
+    """
+    Returns an existing type bobify graph for the type of nodes, with its sources updated to nodes.
+    Graphs are only updated in place if no InputSet graph other than consumer uses them, otherwise
+    a graph whose sources already are nodes is returned, or None.
+    """
+    nodes = mu.getLongNames(nodes)
+    wanted = set(nodes)
+    owners = set(mu.getLongNames([consumer])) if consumer else set()
+    graphs = {}
+    for node in nodes:
+        for graph in BOBIFY_INDEX.find(node, type_graphs=True):
+            graphs[graph] = None
+
+    for graph in graphs:
+        if set(BOBIFY_INDEX.getSources(graph)) == wanted:
+            return graph
+
+    for graph in graphs:
+        if set(BOBIFY_INDEX.getConsumers(graph)) <= owners and updateTypeBobifyGraph(graph, nodes):
+            return graph
+
+    return None
+
+
+@profiler.timed()
+def bobifyNodes(nodes: list[str], replace_transforms=True, use_existing=True, by_type=None, consumer=None) -> list[str]:
     """
     Extends createBobifyGraph for handling a list of nodes.
     Also with options for replacing transforms with shapes and using existing bobify graphs.
     Disabling these parameters is equivalent to calling createBobifyGraph on each node.
+    If by_type (defaults to BY_TYPE), one graph outputting array<Object> is used per node type, existing ones are
+    updated in place unless used by an InputSet graph other than consumer, see getTypeBobifyGraph.
     """
 
+    compounds.ensureLib()
     if replace_transforms:
         nodes = mu.replaceTransformsWithShapes(nodes, no_intermediate=NO_INTERMEDIATE)
 
+    by_type = BY_TYPE if by_type is None else by_type
+    if by_type:
+        nodes_by_type = {}
+        for node, node_type in zip(nodes, mu.getNodeTypes(nodes)):
+            nodes_by_type.setdefault(node_type, []).append(node)
+
+        bobify_graphs = []
+        for type_nodes in nodes_by_type.values():
+            bg = getTypeBobifyGraph(type_nodes, consumer) if use_existing else None
+            bg = bg or createTypeBobifyGraph(type_nodes)
+            if bg:
+                bobify_graphs.append(bg)
+        return bobify_graphs
+
     # Create graphs
     bobify_graphs = []
     for node in nodes:
         if use_existing:
-            bobify_graph = getBobifyGraph(node)
+            bobify_graph = BOBIFY_INDEX.findGraph(node)
             if bobify_graph:
                 bobify_graphs.append(bobify_graph)
                 continue
@@ -100,7 +385,7 @@ def bobifySel(graph=None, port_name=None, replace_transforms=True, use_existing=
     if not bif.isBifrostGraph(graph):
         raise ValueError(f"{graph} Is not a Bifrost graph")
 
-    bobify_graphs = bobifyNodes(sel, replace_transforms=replace_transforms, use_existing=use_existing)
+    bobify_graphs = bobifyNodes(sel, replace_transforms=replace_transforms, use_existing=use_existing, by_type=False)
     if not bobify_graphs:
         return  # all nodes were ignored
 
@@ -122,26 +407,285 @@ def bobifySel(graph=None, port_name=None, replace_transforms=True, use_existing=
     return bobify_graphs, port_name
 
 
-def getBobifyGraph(node):
-    conns = mc.listConnections(node + ".message", s=False, d=True, p=True, type="bifrostBoard")
+# Index ================================================================================================================
+class BobifyIndex:
+    """
+    Maps source nodes to their bobify graphs for the whole scene. It is built with a single query, then kept
+    current through DG callbacks. Nodes are keyed by MObjectHandle hash, so renaming or reparenting them is free.
+    Scene and reference loads only mark it dirty, it's rebuilt on next use.
+    It also counts each graph's consumers, the InputSet graphs connected to its output. A graph whose last consumer
+    disconnects is released to COLLECTOR, other connections (ie. from bobifySel) are not counted.
+    """
+    SCENE_EVENTS = (
+        "kBeforeNew", "kBeforeOpen", "kBeforeImport", "kBeforeCreateReference", "kBeforeLoadReference",
+        "kBeforeUnloadReference", "kBeforeRemoveReference",
+    )
+
+    def __init__(self):
+        self.sources = {}  # source hash: {graph hash: None}
+        self.graphs = {}  # graph hash: (graph MObjectHandle, {source hash: source MObjectHandle}, is type graph)
+        self.consumers = {}  # graph hash: {consumer hash: [consumer MObjectHandle, connections]}
+        self.dirty = True
+        self.callbacks = []
+
+    def watch(self):
+        if self.callbacks:
+            return
+        self.callbacks.append(om.MDGMessage.addConnectionCallback(self.connectionChanged))
+        self.callbacks.append(om.MDGMessage.addNodeRemovedCallback(self.nodeRemoved, "bifrostBoard"))
+        for event in self.SCENE_EVENTS:
+            self.callbacks.append(om.MSceneMessage.addCallback(getattr(om.MSceneMessage, event), self.markDirty))
+
+    def unwatch(self):
+        om.MMessage.removeCallbacks(self.callbacks)
+        self.callbacks = []
+        self.markDirty()
+
+    def markDirty(self, *args):
+        self.dirty = True
+
+    def rebuild(self):
+        self.sources.clear()
+        self.graphs.clear()
+        self.consumers.clear()
+        self.dirty = False
+
+        # every board is indexed, including ones whose sources were deleted, see removeUnused
+        plugs = mc.ls("*.bobifySource", recursive=True) or []
+        type_graphs = {plug.split(".", 1)[0] for plug in mc.ls("*.bobifyType", recursive=True) or []}
+        graphs = {}  # graph name: hash
+        for plug in plugs:
+            graph = plug.split(".", 1)[0]
+            graphs[graph] = self.addGraph(mu.getMObject(graph), graph in type_graphs)
+
+        conns = mc.listConnections(plugs, s=True, d=False, c=True) if plugs else None
+        conns = conns or []
+        for plug, source in zip(conns[0::2], conns[1::2]):
+            graph, attr = plug.split(".", 1)
+            self.add(mu.getMObject(source), mu.getMObject(graph), attr != "bobifySource")
+
+        plugs = mc.ls([f"{graph}.{OUT_PORT_NAME}" for graph in graphs]) if graphs else []
+        conns = mc.listConnections(plugs, s=False, d=True, c=True) if plugs else None
+        conns = conns or []
+        consumers = mc.ls([f"{consumer}.inputSet" for consumer in set(conns[1::2])]) if conns else []
+        consumers = {plug.split(".", 1)[0] for plug in consumers}
+        for plug, consumer in zip(conns[0::2], conns[1::2]):
+            if consumer in consumers:
+                self.addConsumer(graphs[plug.split(".", 1)[0]], mu.getMObject(consumer))
+
+    def ensure(self):
+        """Watches for changes from the first use on, so the index is only built and kept current if it is used."""
+        if not self.callbacks:
+            self.watch()
+        if self.dirty:
+            self.rebuild()
+
+    def addGraph(self, graph_mobj, is_type=False):
+        """Indexes a graph without sources, returns its hash."""
+        graph = om.MObjectHandle(graph_mobj)
+        if graph.hashCode() not in self.graphs:
+            self.graphs[graph.hashCode()] = (graph, {}, is_type)
+        return graph.hashCode()
+
+    def add(self, source_mobj, graph_mobj, is_type=False):
+        source = om.MObjectHandle(source_mobj)
+        graph_key = self.addGraph(graph_mobj, is_type)
+        self.graphs[graph_key][1][source.hashCode()] = source
+        self.sources.setdefault(source.hashCode(), {})[graph_key] = None
+        return graph_key
+
+    def discard(self, source_mobj, graph_mobj):
+        source_key = om.MObjectHandle(source_mobj).hashCode()
+        graph_key = om.MObjectHandle(graph_mobj).hashCode()
+        entry = self.graphs.get(graph_key)
+        if entry is not None:
+            entry[1].pop(source_key, None)
+        graphs = self.sources.get(source_key)
+        if graphs is not None:
+            graphs.pop(graph_key, None)
+            if not graphs:
+                del self.sources[source_key]
+
+    def addConsumer(self, graph_key, consumer_mobj):
+        consumers = self.consumers.setdefault(graph_key, {})
+        consumer = om.MObjectHandle(consumer_mobj)
+        consumers.setdefault(consumer.hashCode(), [consumer, 0])[1] += 1
+        COLLECTOR.retain(graph_key)
+
+    def removeConsumer(self, graph_key, consumer_mobj):
+        consumers = self.consumers.get(graph_key)
+        consumer_key = om.MObjectHandle(consumer_mobj).hashCode()
+        if not consumers or consumer_key not in consumers:
+            return
+        consumers[consumer_key][1] -= 1
+        if consumers[consumer_key][1] <= 0:
+            del consumers[consumer_key]
+        if not consumers:
+            del self.consumers[graph_key]
+            COLLECTOR.release(graph_key, self.graphs[graph_key][0])
+
+    def connectionChanged(self, src_plug, dst_plug, made, cd=None):
+        if self.dirty:  # rebuilt on next use anyway
+            return
+
+        attr = dst_plug.partialName(useLongNames=True)
+        if attr.startswith("bobifySource"):
+            if made:
+                self.add(src_plug.node(), dst_plug.node(), attr != "bobifySource")
+            else:
+                self.discard(src_plug.node(), dst_plug.node())
+
+        elif src_plug.partialName(useLongNames=True) == OUT_PORT_NAME:
+            graph_key = om.MObjectHandle(src_plug.node()).hashCode()
+            if graph_key not in self.graphs or not om.MFnDependencyNode(dst_plug.node()).hasAttribute("inputSet"):
+                return
+            if made:
+                self.addConsumer(graph_key, dst_plug.node())
+            else:
+                self.removeConsumer(graph_key, dst_plug.node())
+
+    def nodeRemoved(self, mobj, cd=None):
+        if self.dirty:
+            return
+        graph_key = om.MObjectHandle(mobj).hashCode()
+        self.consumers.pop(graph_key, None)
+        COLLECTOR.retain(graph_key)
+        entry = self.graphs.pop(graph_key, None)
+        if entry is None:
+            return
+        for source_key in entry[1]:
+            graphs = self.sources.get(source_key, {})
+            graphs.pop(graph_key, None)
+            if not graphs:
+                self.sources.pop(source_key, None)
+
+    def graphName(self, key):
+        graph = self.graphs[key][0]
+        return mu.getDnName(graph.object()) if graph.isValid() else None
+
+    def find(self, node, type_graphs=False) -> list[str]:
+        """Returns the per node bobify graphs of node, or its type bobify graphs if type_graphs."""
+        self.ensure()
+        keys = self.sources.get(om.MObjectHandle(mu.getMObject(node)).hashCode(), ())
+        names = [self.graphName(key) for key in keys if self.graphs[key][2] == type_graphs]
+        return [name for name in names if name]
+
+    def findGraph(self, node):
+        """Returns the first per node bobify graph of node, or None."""
+        graphs = self.find(node)
+        return graphs[0] if graphs else None
+
+    def getSources(self, graph) -> list[str]:
+        """Returns the long names of a bobify graph's sources, empty if it is not a bobify graph."""
+        self.ensure()
+        entry = self.graphs.get(om.MObjectHandle(mu.getMObject(graph)).hashCode())
+        if entry is None:
+            return []
+        return [mu.getMObjectName(source.object()) for source in entry[1].values() if source.isValid()]
+
+    def getConsumers(self, graph) -> list[str]:
+        """Returns the InputSet graphs consuming a bobify graph's output."""
+        self.ensure()
+        consumers = self.consumers.get(om.MObjectHandle(mu.getMObject(graph)).hashCode(), {})
+        return [mu.getMObjectName(handle.object()) for handle, _connections in consumers.values() if handle.isValid()]
+
+    def isGraph(self, graph):
+        self.ensure()
+        return mc.objExists(graph) and om.MObjectHandle(mu.getMObject(graph)).hashCode() in self.graphs
+
+    def listGraphs(self) -> list[str]:
+        self.ensure()
+        names = [self.graphName(key) for key in self.graphs]
+        return [name for name in names if name]
+
+
+class BobifyCollector:
+    """
+    Deletes released bobify graphs, see BobifyIndex.consumers. Graphs are deleted in batches of COLLECT_BATCH
+    when Maya is idle, so disconnecting many at once never stalls. A graph that gets a new consumer before
+    it is collected is kept.
+    Graphs are only released inside 'with COLLECTOR:', which inputSet.UpdateScheduler.flush wraps around its
+    updates. Those run without undo, so deleting the graphs without undo can't break a later undo, and
+    disconnects made by the user never lead to a deletion.
+    """
 
-    if not conns:
-        return None
+    def __init__(self):
+        self.released = {}  # graph hash: MObjectHandle
+        self.collected = 0
+        self.collect_pending = False
+        self.depth = 0  # open 'with COLLECTOR:' blocks
 
-    for conn in conns:
-        if conn.endswith(".bobifySource"):
-            return conn.split(".")[0]
+    def __enter__(self):
+        self.depth += 1
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        self.depth -= 1
+
+    def release(self, graph_key, handle):
+        if not AUTO_COLLECT or not self.depth:
+            return
+        self.released[graph_key] = handle
+        if not self.collect_pending:
+            self.collect_pending = True
+            mc.evalDeferred(self.collect, lowestPriority=True)
+
+    def retain(self, graph_key):
+        self.released.pop(graph_key, None)
+
+    def collect(self):
+        self.collect_pending = False
+        BOBIFY_INDEX.ensure()  # if the index was rebuilt, released graphs are checked against fresh counts
+
+        keys = list(self.released)[:COLLECT_BATCH]
+        graphs = []
+        for key in keys:
+            handle = self.released.pop(key)
+            if handle.isValid() and key in BOBIFY_INDEX.graphs and key not in BOBIFY_INDEX.consumers:
+                graphs.append(mu.getDnName(handle.object()))
+
+        if graphs:
+            with mu.UndoState(False):
+                mc.delete(graphs)
+            self.collected += len(graphs)
+
+        if self.released and not self.collect_pending:
+            self.collect_pending = True
+            mc.evalDeferred(self.collect, lowestPriority=True)
 
-    return None
 
+BOBIFY_INDEX = BobifyIndex()
+COLLECTOR = BobifyCollector()
 
-def removeUnused():
+
+def getBobifyGraph(node):
+    return BOBIFY_INDEX.findGraph(node)
+
+
+def getBobifySources(graphs: list[str]) -> dict:
     """
-    Delete bobify graphs with no output connection
+    Returns {bobify graph: long name of its source node}, see BobifyIndex.
+    Source is None if the graph is not a bobify graph or its source no longer exists.
     """
-    for graph in mc.ls(type="bifrostBoard"):
-        if not mc.objExists(graph + ".bobifySource"):
-            continue
+    sources = {}
+    for graph in graphs:
+        graph_sources = BOBIFY_INDEX.getSources(graph) if mc.objExists(graph) else []
+        sources[graph] = graph_sources[0] if graph_sources else None
+    return sources
+
 
-        if not mc.listConnections(f"{graph}.{OUT_PORT_NAME}", s=False, d=True):
-            mc.delete(graph)
+def removeUnused(graphs=None) -> list[str]:
+    """
+    Delete bobify graphs with no output connection, checking all bobify graphs in the scene unless given.
+    Returns the deleted graphs.
+    """
+    graphs = BOBIFY_INDEX.listGraphs() if graphs is None else [graph for graph in graphs if BOBIFY_INDEX.isGraph(graph)]
+    if not graphs:
+        return []
+
+    conns = mc.listConnections([f"{graph}.{OUT_PORT_NAME}" for graph in graphs], s=False, d=True, c=True) or []
+    used = {plug.split(".", 1)[0] for plug in conns[0::2]}
+    unused = [graph for graph in graphs if graph not in used]
+    if unused:
+        mc.delete(unused)
+    return unused
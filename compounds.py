@@ -2,97 +2,231 @@ import os
 from maya import cmds as mc, mel
 from . import __MP__, signature, bobify
 from .packages import bifrostUtils as bif
+from .packages import profiler
+from .packages.melBatch import MelBatch
+from .packages.userdata import readJson, writeJson
 
 # Location where compounds will be published
 LIB_PATH = os.path.expanduser('~').replace("\\", "/") + "/Autodesk/Bifrost/Compounds/AllTheInputs"
 NAMESPACE = "ATI"  # Compounds namespace
 TYPE_CHECK_NAME = "bobify_type_check"
+MANIFEST_FILE = LIB_PATH + "/manifest.json"  # published file: content hash of what it was built from
+MANIFEST = None
+COMPOUNDS_VERSION = 1  # part of every content hash, bump when the way compounds are built changes
+LIB_VERIFIED = False
+PUBLISHED = None  # names of compounds in NAMESPACE, only queried once, see isPublished
 
 
+@profiler.timed()
 def verifyLib():
     """
-    This runs when the module is imported.
+    This runs when the package is imported, or on first use if AllTheInputs.LAZY_INIT is set, see ensureLib.
     It checks for, and publishes core compounds if they are missing.
     """
+    global LIB_VERIFIED
+    LIB_VERIFIED = True
 
-    ns_exists = NAMESPACE in mc.vnn(lib='BifrostGraph')
-    ns_nodes = mc.vnn(nd=['BifrostGraph', NAMESPACE]) if ns_exists else []
+    # both only republish if their content changed, see isUpToDate
+    publishTypeCheck()
+    publishMakeBreakSet()
 
-    if not (ns_exists and TYPE_CHECK_NAME in ns_nodes):
-        publishTypeCheck()
 
-    if not (ns_exists and "break_set" in ns_nodes and "make_set" in ns_nodes):
-        publishMakeBreakSet()
+def ensureLib():
+    if not LIB_VERIFIED:
+        verifyLib()
+
+
+def loadManifest() -> dict:
+    global MANIFEST
+    if MANIFEST is None:
+        MANIFEST = readJson(MANIFEST_FILE) or {}
+    return MANIFEST
+
+
+def compoundHash(*content) -> str:
+    return signature.contentHash([COMPOUNDS_VERSION, *content])
+
+
+def isUpToDate(filename, content_hash) -> bool:
+    """Returns True if the compound file exists and was published from the same content."""
+    return loadManifest().get(os.path.basename(filename)) == content_hash and os.path.isfile(filename)
+
+
+def recordPublished(filename, content_hash):
+    loadManifest()[os.path.basename(filename)] = content_hash
+    writeJson(MANIFEST_FILE, MANIFEST)
+
 
+def isPublished(compound_name):
+    global PUBLISHED
+    if PUBLISHED is None:
+        ns_exists = NAMESPACE in mc.vnn(lib='BifrostGraph')
+        PUBLISHED = set(mc.vnn(nd=['BifrostGraph', NAMESPACE]) if ns_exists else [])
+    return compound_name in PUBLISHED
 
-def publishTypeCheck(graph=None):
+
+def setPublished(*compound_names):
+    if PUBLISHED is not None:
+        PUBLISHED.update(compound_names)
+
+
+@profiler.timed()
+def publishTypeCheck(graph=None, force=False):
     """
     This compound published by this function returns true if the input object matches the 'node_type' property.
     This should be run any time a signature is created/edited, so that the combobox is updated.
     'node_type' is a string, so republishing this should never break existing graphs.
+    Skipped if the list of node types has not changed since the last publish, unless forced.
     """
 
     node_types = signature.listSignatureTypes(filter_ignored=True)
+    dst = f"{LIB_PATH}/{TYPE_CHECK_NAME}.json"
+    content_hash = compoundHash(TYPE_CHECK_NAME, sorted(node_types))
+    if not force and isUpToDate(dst, content_hash):
+        if graph is not None:
+            mc.delete(graph)
+        return
+
     graph = mc.createNode("bifrostBoard", ss=True) if graph is None else graph
 
     mc.vnnCompound(graph, "/", create=f"{TYPE_CHECK_NAME}")
-    bif.createOutputPort(graph, f"/{TYPE_CHECK_NAME}/input", "object", "Object")
-    port = bif.createOutputPort(graph, f"/{TYPE_CHECK_NAME}/input", "node_type", "string")
-    mc.vnnNode(graph, f"/{TYPE_CHECK_NAME}", setMetaDataFromString='NodeValueDisplay={show=1;format="Is Bobify {node_type}"}')
+    ports = bif.createPorts(graph, f"/{TYPE_CHECK_NAME}/input", [("object", "Object", ""), ("node_type", "string", "")])
+    port = ports.get(1)  # node_type
+    if port is None:
+        mc.warning(f"Could not build {TYPE_CHECK_NAME}, failed to create its node_type port")
+        mc.delete(graph)
+        return
+
+    batch = MelBatch()
+    batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}", setMetaDataFromString='NodeValueDisplay={show=1;format="Is Bobify {node_type}"}')
 
     if node_types:
-        mc.vnnNode(graph, f"/{TYPE_CHECK_NAME}", spv=[port, node_types[0]])
-        mc.vnnNode(graph, f"/{TYPE_CHECK_NAME}", spm=[port, "UIWidget", "ComboBox"])
-        mc.vnnNode(graph, f"/{TYPE_CHECK_NAME}", spm=[port, "UIWidgetProp", "items={%s}" % ";".join(node_types)])
+        batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}", spv=[port, node_types[0]])
+        batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}", spm=[port, "UIWidget", "ComboBox"])
+        batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}", spm=[port, "UIWidgetProp", "items={%s}" % ";".join(node_types)])
 
     # get_property
-    mc.vnnCompound(graph, f"/{TYPE_CHECK_NAME}", addNode="BifrostGraph,Core::Object,get_property")
-    mc.vnnNode(graph, f"/{TYPE_CHECK_NAME}/get_property", spt=["default_and_type", "string"])
-    mc.vnnNode(graph, f"/{TYPE_CHECK_NAME}/get_property", spv=["key", "node_type"])
-    mc.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/input.object", f"/{TYPE_CHECK_NAME}/get_property.object")
+    batch.vnnCompound(graph, f"/{TYPE_CHECK_NAME}", addNode="BifrostGraph,Core::Object,get_property")
+    batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}/get_property", spt=["default_and_type", "string"])
+    batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}/get_property", spv=["key", "node_type"])
+    batch.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/input.object", f"/{TYPE_CHECK_NAME}/get_property.object")
 
     # equal
-    mc.vnnCompound(graph, f"/{TYPE_CHECK_NAME}", addNode="BifrostGraph,Core::Logic,equal")
-    mc.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/get_property.value", f"/{TYPE_CHECK_NAME}/equal.first")
-    mc.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/input.node_type", f"/{TYPE_CHECK_NAME}/equal.second")
+    batch.vnnCompound(graph, f"/{TYPE_CHECK_NAME}", addNode="BifrostGraph,Core::Logic,equal")
+    batch.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/get_property.value", f"/{TYPE_CHECK_NAME}/equal.first")
+    batch.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/input.node_type", f"/{TYPE_CHECK_NAME}/equal.second")
 
     # output
-    bif.createInputPort(graph, f"/{TYPE_CHECK_NAME}/output", "output", "bool")
-    mc.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/equal.output", f"/{TYPE_CHECK_NAME}/output.output")
+    batch.vnnNode(graph, f"/{TYPE_CHECK_NAME}/output", createInputPort=("output", "bool"))
+    batch.vnnConnect(graph, f"/{TYPE_CHECK_NAME}/equal.output", f"/{TYPE_CHECK_NAME}/output.output")
+    if batch.flush():  # not published or recorded, so the next call retries
+        mc.warning(f"Could not build {TYPE_CHECK_NAME}, failed commands: {len(batch.errors)}")
+        mc.delete(graph)
+        return
 
     # publish
     os.makedirs(LIB_PATH, exist_ok=True)
-    mc.vnnCompound(graph, f"/{TYPE_CHECK_NAME}", publish=[f"{LIB_PATH}/{TYPE_CHECK_NAME}.json", NAMESPACE, f"{TYPE_CHECK_NAME}", False])
+    mc.vnnCompound(graph, f"/{TYPE_CHECK_NAME}", publish=[dst, NAMESPACE, f"{TYPE_CHECK_NAME}", False])
+    setPublished(TYPE_CHECK_NAME)
+    recordPublished(dst, content_hash)
     mc.delete(graph)
 
 
-def publishMakeBreakSet():
+@profiler.timed()
+def publishMakeBreakSet(force=False):
     """
     Publish make/break compounds specifically for Input Sets.
-    This should only ever run once unless the user deletes the compound file.
+    This should only ever run once unless the user deletes the compound file, or its scripts change.
     """
+    scripts = []
+    for filename in ("makeSet_compound.mel", "breakSet_compound.mel"):
+        with open(f"{__MP__}/scripts/{filename}", "r") as f:
+            scripts.append(f.read())
+
+    dst = LIB_PATH + "/make_break_set.json"
+    content_hash = compoundHash("make_break_set", scripts)
+    if not force and isUpToDate(dst, content_hash):
+        return
+
     graph = mc.createNode("bifrostBoard", ss=True)
     mel.eval(f'string $gInputSetGraph = "{graph}";source "{__MP__}/scripts/makeSet_compound.mel";source "{__MP__}/scripts/breakSet_compound.mel";')
 
     os.makedirs(LIB_PATH, exist_ok=True)
-    dst = LIB_PATH + "/make_break_set.json"
     mc.vnnCompound(graph, "/make_set", publish=[dst, NAMESPACE, "make_set", False])
     mc.vnnCompound(graph, "/break_set", publish=[dst, NAMESPACE, "break_set", False])
+    setPublished("make_set", "break_set")
+    recordPublished(dst, content_hash)
     mc.delete(graph)
 
 
-def publishMakeAndBreakSig(node_type):
+class PublishBatch:
+    """
+    Collects signature saves and publishes the make/break compounds of every changed type when the outermost
+    batch exits without an exception, with the type check compound published once at the end.
+
+    with compounds.PublishBatch():
+        for sig in sigs:
+            sig.save()
+    """
+    active = None  # outermost open batch
+
+    def __init__(self):
+        self.node_types = {}  # dict keys instead of set to maintain order
+        self.saves = 0
+
+    def add(self, node_type):
+        self.node_types[node_type] = None
+        self.saves += 1
+
+    def publish(self):
+        for node_type in self.node_types:
+            publishMakeAndBreakSig(node_type, type_check=False)
+        publishTypeCheck()
+
+    def __enter__(self):
+        if PublishBatch.active is None:
+            PublishBatch.active = self
+        return PublishBatch.active
+
+    def __exit__(self, _type, value, traceback):
+        if PublishBatch.active is self:
+            PublishBatch.active = None
+            if _type is None:  # same as MelBatch, nothing is published if the block raised
+                self.publish()
+
+
+def requestPublish(node_type):
+    """
+    Publishes make/break compounds for the node type, or queues them if a PublishBatch is open.
+    """
+    if PublishBatch.active is not None:
+        PublishBatch.active.add(node_type)
+    else:
+        publishMakeAndBreakSig(node_type)
+
+
+@profiler.timed()
+def publishMakeAndBreakSig(node_type, force=False, type_check=True):
     """
     Publish make/break compounds for the given node type based on its signature.
+    The compounds are only rebuilt if the signature changed since they were last published, unless forced.
+    If type_check, the type check compound is also republished, see publishTypeCheck.
     """
     sig = signature.getSignature(node_type)
+    dst = LIB_PATH + f"/make_break_{node_type}.json"
+    content_hash = compoundHash(node_type, sig.attrs, sig.geo_attr)
+    if not (force or sig.ignore) and isUpToDate(dst, content_hash):
+        if type_check:
+            publishTypeCheck()
+        return True
 
     dummy_node = mc.createNode(node_type, ss=True)
-    graph = bobify.createBobifyGraph(dummy_node)
+    graph = bobify.createBobifyGraph(dummy_node, use_compound=False, use_prototype=False)
     signature.deleteDummyNode(dummy_node)
 
     if not graph:
-        publishTypeCheck()
+        if type_check:
+            publishTypeCheck()
         return False
 
     #### Get property node info
@@ -127,22 +261,39 @@ def publishMakeAndBreakSig(node_type):
     # create object input
     in_port_path = f'/{break_compound}/input.{bif.createOutputPort(graph, f"/{break_compound}/input", node_type, "Object")}'
     out_node = f"/{break_compound}/output"
-    for key, _type in zip(prop_keys, prop_types):
-        new_port = bif.createInputPort(graph, out_node, key, _type)  # create port
-
-        # Setup get_property node
-        get_property = f"/{break_compound}/" + mc.vnnCompound(graph, f"/{break_compound}", addNode="BifrostGraph,Core::Object,get_property")[0]
-
-        mc.vnnNode(graph, get_property, spv=("key", key))
-        mc.vnnNode(graph, get_property, spt=("default_and_type", _type))
-        mc.vnnConnect(graph, in_port_path, f"{get_property}.object")
-        mc.vnnConnect(graph, f"{get_property}.value", f"{out_node}.{new_port}")
+    new_ports = bif.createPorts(graph, out_node, [(key, _type, "") for key, _type in zip(prop_keys, prop_types)], is_output=False)
+    get_properties = bif.nodeNames("get_property")
+    with MelBatch() as batch:
+        for x, (key, _type) in enumerate(zip(prop_keys, prop_types)):
+            new_port = new_ports.get(x)
+            if new_port is None:  # port could not be created, see createPorts
+                continue
+
+            # Setup get_property node
+            get_property = f"/{break_compound}/{next(get_properties)}"
+            batch.vnnCompound(graph, f"/{break_compound}", addNode="BifrostGraph,Core::Object,get_property")
+
+            batch.vnnNode(graph, get_property, spv=("key", key))
+            batch.vnnNode(graph, get_property, spt=("default_and_type", _type))
+            batch.vnnConnect(graph, in_port_path, f"{get_property}.object")
+            batch.vnnConnect(graph, f"{get_property}.value", f"{out_node}.{new_port}")
+
+    if batch.errors:  # later get_property names were predicted from the failed ones, not published or recorded
+        mc.warning(f"Could not build {break_compound}, failed commands: {len(batch.errors)}")
+        mc.delete(graph)
+        if type_check:
+            publishTypeCheck()
+        return False
 
     #### Publish
-    dst = LIB_PATH + f"/make_break_{node_type}.json"
     mc.vnnCompound(graph, f"/{make_compound}", publish=[dst, "ATI", make_compound, False])
     mc.vnnCompound(graph, f"/{break_compound}", publish=[dst, "ATI", break_compound, False])
+    setPublished(make_compound, break_compound)
+    recordPublished(dst, content_hash)
 
-    publishTypeCheck(graph)  # this will also del graph
+    if type_check:
+        publishTypeCheck(graph)  # this will also del graph
+    else:
+        mc.delete(graph)
 
     return True
@@ -8,7 +8,8 @@ from maya import cmds as mc, mel
 
 from .packages import bifrostUtils as bif
 from .packages import mayaUtils as mu
-from . import bobify
+from .packages import profiler
+from . import bobify, compounds
 from . import __MP__
 from .signature import deleteDummyNode
 
@@ -19,19 +20,63 @@ such node type in their graph its likely they'd want additional attributes and f
 So instead we explicitly list the node types that should be treated as 'input by path' transforms.
 """
 TRANSFORM_CLASSES = ["transform", "locator", "joint", "BetterLocator"]
-CALLBACKS = []
+WIRING = {"api": mu.ApiWiring, "cmds": mu.CmdsWiring}  # see InputSet.wiring
 
 
-with open(f"{__MP__}/scripts/scriptNode_openScene.py", "r") as f:
-    OPEN_SCRIPT = f.read()
-with open(f"{__MP__}/scripts/scriptNode_closeScene.py", "r") as f:
-    CLOSE_SCRIPT = f.read()
+SCRIPTS = {}  # script files are only read when first needed, see readScript
 
 
+def readScript(filename):
+    if filename not in SCRIPTS:
+        with open(f"{__MP__}/scripts/{filename}", "r") as f:
+            SCRIPTS[filename] = f.read()
+    return SCRIPTS[filename]
+
+
+class UpdateScheduler:
+    """
+    Collects dirty InputSets from all callbacks and updates them in a single deferred flush.
+    Any number of member changes to any number of sets between idle events results in one update per set.
+    """
+
+    def __init__(self):
+        self.dirty = {}  # MObjectHandle hash: Callback
+        self.requests = 0  # requests since last flush
+        self.merged = 0  # total requests merged into an already pending update
+        self.flush_pending = False
+
+    def schedule(self, callback):
+        self.requests += 1
+        self.dirty[callback.key()] = callback
+        if not self.flush_pending:
+            self.flush_pending = True
+            mc.evalDeferred(self.flush)
+
+    def flush(self):
+        callbacks = [cb for cb in self.dirty.values() if cb in CALLBACKS and cb.isValid()]  # skip ones removed since
+        callbacks.sort(key=lambda cb: cb.dnName())
+        requests = self.requests
+        self.dirty = {}
+        self.requests = 0
+        self.flush_pending = False
+
+        with mu.UndoState(False), bobify.COLLECTOR:  # graphs these updates disconnect can be collected
+            for cb in callbacks:
+                try:
+                    cb.update(wiring="api")  # undo is off, so the MDGModifier needs no undo support
+                except Exception as e:
+                    mc.warning(f"Failed to update InputSet '{cb.dnName()}': {e}")
+
+        self.merged += requests - len(callbacks)
+
+
+SCHEDULER = UpdateScheduler()
+
 class Callback:
     callback: int
+    name_callback: int
     has_callback: bool = False
-    pending_update: bool = False
+    members: dict = None  # last known membership, see mu.getSetMembers
 
     def __init__(self, node: str | om.MObject):
         if isinstance(node, om.MObject):
@@ -40,57 +85,146 @@ class Callback:
             self.mobj = mu.getMObject(node)
         else:
             raise ValueError("Must provide a valid set name or MObject")
+        self.handle = om.MObjectHandle(self.mobj)
         self.add()
 
     def add(self):
         print("Callback created for: ", self.dnName())
         self.callback = om.MObjectSetMessage.addSetMembersModifiedCallback(self.mobj, self.setMembersChanged)
-        self.has_callback = True
+        self.name_callback = om.MNodeMessage.addNameChangedCallback(self.mobj, self.nameChanged)
+        self.has_callback = True  # no snapshot yet, so the first update is a full rescan, see membersDelta
 
     def remove(self):
-        om.MMessage.removeCallback(self.callback)
+        om.MMessage.removeCallbacks([self.callback, self.name_callback])
         self.has_callback = False
 
+    def key(self):
+        return self.handle.hashCode()
+
+    def isValid(self):
+        return self.handle.isValid()
+
     def dnName(self):
         return mu.getDnName(self.mobj)
 
-    def setPending(self, state):
-        self.pending_update = state
+    def takeSnapshot(self):
+        self.members = mu.getSetMembers(self.mobj)
+
+    def membersDelta(self):
+        """
+        Returns the (added, removed) members since the last snapshot as long names, then takes a new snapshot.
+        Returns None if there was no snapshot to compare against.
+        """
+        previous = self.members
+        self.takeSnapshot()
+        if previous is None:
+            return None
 
-    def setMembersChanged(self, mobj=None, cd=None):
-        if self.pending_update:
-            return  # update already pending
+        added = [handle for key, handle in self.members.items() if key not in previous]
+        removed = [handle for key, handle in previous.items() if key not in self.members]
 
-        self.setPending(True)
+        # deleted nodes are skipped, their connections to the graph are already gone
+        added = [mu.getMObjectName(handle.object()) for handle in added if handle.isValid()]
+        removed = [mu.getMObjectName(handle.object()) for handle in removed if handle.isValid()]
+        return added, removed
 
-        set_name = self.dnName()
-        input_set = InputSet(set_name)
+    def nameChanged(self, mobj=None, prev_name="", cd=None):
+        CALLBACKS.rename(self, self.dnName())
+
+    def setMembersChanged(self, mobj=None, cd=None):
+        SCHEDULER.schedule(self)
+
+    def update(self, wiring=None):
+        """wiring overrides InputSet.wiring, "api" is only safe while undo is off, see UpdateScheduler.flush."""
+        input_set = InputSet(self.dnName())
+        if wiring is not None:
+            input_set.wiring = wiring
         if not input_set.graph:
             self.remove()
             CALLBACKS.remove(self)
             mc.warning(f"Object set '{input_set.name}' has no graph, callback removed")
             return
 
-        def updateGraph():
-            with mu.UndoState(False):
-                input_set.updateGraph()
+        delta = self.membersDelta()
+        if delta is None:
+            input_set.updateGraph()  # fallback to full rescan
+        else:
+            input_set.updateGraph(*delta)
 
-        mc.evalDeferred(updateGraph)
-        mc.evalDeferred(lambda: self.setPending(False))
+
+class CallbackRegistry:
+    """
+    Callbacks indexed by MObjectHandle hash, and by set name which is kept current by Callback.nameChanged.
+    """
+
+    def __init__(self):
+        self.callbacks = {}  # MObjectHandle hash: Callback
+        self.names = {}  # set name: MObjectHandle hash
+        self.keys = {}  # MObjectHandle hash: set name
+
+    def __iter__(self):
+        return iter(list(self.callbacks.values()))
+
+    def __len__(self):
+        return len(self.callbacks)
+
+    def __contains__(self, callback):
+        return self.callbacks.get(callback.key()) is callback
+
+    def add(self, callback: Callback):
+        key = callback.key()
+        self.callbacks[key] = callback
+        self.rename(callback, callback.dnName())
+
+    def remove(self, callback: Callback):
+        key = callback.key()
+        del self.callbacks[key]
+        self.names.pop(self.keys.pop(key, None), None)
+
+    def rename(self, callback: Callback, name):
+        key = callback.key()
+        if key not in self.callbacks:
+            return
+        self.names.pop(self.keys.get(key), None)
+        self.names[name] = key
+        self.keys[key] = name
+
+    def find(self, node) -> Callback | None:
+        if isinstance(node, om.MObject):
+            callback = self.callbacks.get(om.MObjectHandle(node).hashCode())
+            return callback if callback is not None and callback.mobj == node else None
+
+        elif isinstance(node, str):
+            key = self.names.get(node)
+            return None if key is None else self.callbacks.get(key)
+
+        else:
+            raise TypeError(f"Must provide a valid set name or MObject, got: {type(node)}")
+
+    def clear(self):
+        self.callbacks.clear()
+        self.names.clear()
+        self.keys.clear()
+
+
+CALLBACKS = CallbackRegistry()
 
 
 class InputSet:
     bobify_all = False
     bobify_other = True
+    incremental = True  # if False, updateGraph will tear down and reconnect all inputs
+    wiring = "cmds"  # how incremental updates apply connection changes, key of WIRING, see Callback.update
     members: list[str]
 
-    def __init__(self, set_name, new=False):
+    def __init__(self, set_name, new=False, graph=None):
         self.name = set_name
-        self.graph = self.getGraph()
+        self.graph = self.getGraph() if graph is None else graph
         if new and not self.graph:
             self.graph = self.createGraph()
             self.updateGraph()
 
+    @profiler.timed()
     def listMembers(self):
         nodes = []
         dag_nodes = mc.listConnections(self.name + ".dagSetMembers", s=True, d=False)
@@ -109,6 +243,7 @@ class InputSet:
         mc.setAttr(graph + ".displayOutputsInViewport", 0)
         mc.setAttr(graph + ".displayOutputsInRenderer", 0)
         mel.eval(f'string $gInputSetGraph = "{graph}";source "{__MP__}/scripts/objectSet_graph.mel";')
+        mel.eval(f'string $gInputSetGraph = "{graph}";source "{__MP__}/scripts/objectSet_typeBobs.mel";')
 
         # Del bif shape
         # mc.delete(mc.listConnections(f"{graph}.object_set", d=True, s=False))
@@ -131,7 +266,102 @@ class InputSet:
         else:
             raise RuntimeError(f"Graph for object set '{self.name}' is None")
 
-    def updateGraph(self):
+    def ensureTypeBobsPort(self):
+        """Graphs created before type bobify graphs lack their type_bobs input, see scripts/objectSet_typeBobs.mel."""
+        if not mc.objExists(f"{self.graph}.type_bobs"):
+            mel.eval(f'string $gInputSetGraph = "{self.graph}";source "{__MP__}/scripts/objectSet_typeBobs.mel";')
+
+    def bobsPorts(self):
+        """
+        Returns the port bobify graphs connect to and the one that must be empty. Type bobify graphs output
+        array<Object>, so they go to type_bobs, see bobify.createTypeBobifyGraph.
+        """
+        if bobify.BY_TYPE:
+            self.ensureTypeBobsPort()
+            return "type_bobs", "bobs"
+        return "bobs", "type_bobs"
+
+    @profiler.timed()
+    def updateGraph(self, added=None, removed=None):
+        """
+        If added/removed members are given, only those are applied to the graph, otherwise the set is rescanned.
+        """
+        if not self.incremental:
+            self.rebuildGraph()
+        elif added is not None or removed is not None:
+            self.applyDelta(added or [], removed or [])
+        else:
+            self.syncGraph()
+
+    def sortMembers(self, nodes):
+        if self.bobify_all:
+            return [], [], [], nodes
+        return sortNodesByInputType(nodes)
+
+    @profiler.timed()
+    def syncGraph(self):
+        """
+        Incremental update, only the inputs that changed between the graph and the set are rewired.
+        """
+        if self.listMembers():
+            meshes, curves, transforms, other = self.sortMembers(self.members)
+        else:
+            meshes, curves, transforms, other = [], [], [], []
+
+        wiring = WIRING[self.wiring]()
+        syncMultiInput(self.graph, "meshes", "worldMesh[0]", meshes, wiring=wiring)
+        changed, curves = syncMultiInput(self.graph, "strands", "worldSpace[0]", curves, wiring=wiring)
+        if changed and curves:
+            mc.bifrostGraph(self.graph, setInputByPathFlag=["strands", "path", " ".join(curves)])
+        syncMultiInput(self.graph, "transforms", "worldMatrix[0]", transforms, wiring=wiring)
+
+        bobify_graphs = []
+        if other and (self.bobify_other or self.bobify_all):
+            bobify_graphs = bobify.bobifyNodes(other, consumer=self.graph)
+        port, empty_port = self.bobsPorts()
+        syncMultiInput(self.graph, port, bobify.OUT_PORT_NAME, bobify_graphs or [], wiring=wiring)
+        if mc.objExists(f"{self.graph}.{empty_port}"):
+            syncMultiInput(self.graph, empty_port, bobify.OUT_PORT_NAME, [], wiring=wiring)
+        wiring.apply()
+
+    @profiler.timed()
+    def applyDelta(self, added, removed):
+        """
+        Incremental update from a membership delta, members that did not change are never listed or sorted.
+        Inputs are removed if they came from a removed member, or from a shape of a removed member.
+        """
+        if bobify.BY_TYPE:
+            return self.syncGraph()  # type bobify graphs are built from all members of a type
+
+        meshes, curves, transforms, other = self.sortMembers(added) if added else ([], [], [], [])
+        removed = set(removed)
+
+        wiring = WIRING[self.wiring]()
+        syncMultiInput(self.graph, "meshes", "worldMesh[0]", added=meshes, removed=removed, wiring=wiring)
+        changed, curves = syncMultiInput(self.graph, "strands", "worldSpace[0]", added=curves, removed=removed, wiring=wiring)
+        if changed and curves:
+            mc.bifrostGraph(self.graph, setInputByPathFlag=["strands", "path", " ".join(mu.getLongNames(curves))])
+        syncMultiInput(self.graph, "transforms", "worldMatrix[0]", added=transforms, removed=removed, wiring=wiring)
+
+        bobify_graphs = []
+        if other and (self.bobify_other or self.bobify_all):
+            bobify_graphs = bobify.bobifyNodes(other) or []
+
+        # always swept, deleted members are not in removed but leave their graph without a source
+        removed_graphs = set()
+        connected = mc.listConnections(f"{self.graph}.bobs", s=True, d=False) or []
+        for bobify_graph, source in bobify.getBobifySources(connected).items():
+            if source is None or isOwnedBy(source, removed):
+                removed_graphs.add(bobify_graph)
+
+        syncMultiInput(self.graph, "bobs", bobify.OUT_PORT_NAME, added=bobify_graphs, removed=removed_graphs, wiring=wiring)
+        wiring.apply()
+
+    @profiler.timed()
+    def rebuildGraph(self):
+        """
+        Full update, all inputs are removed then reconnected.
+        """
         # Keep graph name in sync with set name, idk if I want this
         # graph = mc.rename(graph, f"{set_name}_graph")
 
@@ -149,6 +379,9 @@ class InputSet:
             mc.removeMultiInstance(f"{self.graph}.transforms[*]", b=True)
         for x in range(mc.getAttr(f"{self.graph}.bobs", size=True)):
             mc.removeMultiInstance(f"{self.graph}.bobs[*]", b=True)
+        if mc.objExists(f"{self.graph}.type_bobs"):
+            for x in range(mc.getAttr(f"{self.graph}.type_bobs", size=True)):
+                mc.removeMultiInstance(f"{self.graph}.type_bobs[*]", b=True)
 
         if not self.listMembers():
             return
@@ -171,10 +404,11 @@ class InputSet:
                     mc.connectAttr(f"{transform}.worldMatrix[0]", f"{self.graph}.transforms[{x}]")
 
         if other and (self.bobify_other or self.bobify_all):
-            bobify_graphs = bobify.bobifyNodes(other)
+            bobify_graphs = bobify.bobifyNodes(other, consumer=self.graph)
             if bobify_graphs:
+                port = self.bobsPorts()[0]
                 for x, bobify_graph in enumerate(bobify_graphs):
-                    mc.connectAttr(f"{bobify_graph}.{bobify.OUT_PORT_NAME}", f"{self.graph}.bobs[{x}]")
+                    mc.connectAttr(f"{bobify_graph}.{bobify.OUT_PORT_NAME}", f"{self.graph}.{port}[{x}]")
 
 
 # Manage Callbacks =====================================================================================================
@@ -182,17 +416,7 @@ def findCallback(callback) -> Callback:
     """
     Find a callback by set name or MObject
     """
-    if isinstance(callback, om.MObject):
-        for cb in CALLBACKS:
-            if callback == cb.mobj:
-                return cb
-
-    elif isinstance(callback, str):
-        for cb in CALLBACKS:
-            if callback == cb.dnName():
-                return cb
-    else:
-        raise TypeError(f"Must provide a valid set name or MObject, got: {type(callback)}")
+    return CALLBACKS.find(callback)
 
 
 def removeCallback(callback):
@@ -216,7 +440,8 @@ def removeAllCallbacks():
 def recreateCallbacks():
     removeAllCallbacks()
     for input_set in listInputSetsFromScene():
-        CALLBACKS.append(Callback(input_set.name))
+        if findCallback(input_set.name) is None:  # a set wired to several graphs is listed once per graph
+            CALLBACKS.add(Callback(input_set.name))
 
 
 # Manage InputSets =====================================================================================================
@@ -237,9 +462,10 @@ def newInputSet(set_name):
     if not nodeCanBeInputSet(set_name):
         raise RuntimeError(f"'{set_name}' Is not a valid set")
 
+    compounds.ensureLib()
     input_set = InputSet(set_name, new=True)
     if not findCallback(input_set.name):
-        CALLBACKS.append(Callback(input_set.name))
+        CALLBACKS.add(Callback(input_set.name))
     createScriptNode()
     return input_set.graph
 
@@ -279,20 +505,33 @@ def newInputSetSel(graph=None):
 
 
 def listInputSetsFromScene():
+    """
+    Finds InputSets starting from graphs with an 'inputSet' attr, rather than checking every set in the scene.
+    Returns one InputSet per graph, so a set wired to several graphs is listed for each of them.
+    """
+    plugs = mc.ls("*.inputSet", recursive=True) or []
+    graphs = set(mc.ls([plug.split(".", 1)[0] for plug in plugs], type=["bifrostGraphShape", "bifrostBoard"]) or [])
+    plugs = [plug for plug in plugs if plug.split(".", 1)[0] in graphs]
+    if not plugs:
+        return []
+
+    conns = mc.listConnections(plugs, s=True, d=False, c=True) or []
+    set_names = set(mc.ls(conns[1::2], type="objectSet") or [])
+
     input_sets = []
-    for set_name in mc.ls(type="objectSet"):
-        input_set = InputSet(set_name)
-        if input_set.graph:
-            input_sets.append(input_set)
+    for plug, set_name in zip(conns[0::2], conns[1::2]):
+        if set_name in set_names:
+            input_sets.append(InputSet(set_name, graph=plug.split(".", 1)[0]))
 
     return input_sets
 
 
+@profiler.timed()
 def sortNodesByInputType(nodes):
     meshes, curves, transforms, other = [], [], [], []
-    for node in mu.replaceTransformsWithShapes(nodes, no_intermediate=bobify.NO_INTERMEDIATE):
+    nodes = mu.replaceTransformsWithShapes(nodes, no_intermediate=bobify.NO_INTERMEDIATE)
+    for node, node_type in zip(nodes, mu.getNodeTypes(nodes)):
         # inherited_types = mc.nodeType(_node, inherited=True)
-        node_type = mc.nodeType(node)
         if node_type == "mesh":
             meshes.append(node)
         elif node_type == "nurbsCurve":
@@ -304,6 +543,98 @@ def sortNodesByInputType(nodes):
     return meshes, curves, transforms, other
 
 
+def multiIndex(plug: str) -> int:
+    return int(plug.rsplit("[", 1)[-1].rstrip("]"))
+
+
+def isOwnedBy(node: str, owners: set) -> bool:
+    """Returns True if the long name node is in owners, or is a direct child (ie. shape) of one."""
+    return node in owners or node.rsplit("|", 1)[0] in owners
+
+
+def listOwned(owners) -> list[str]:
+    """Returns the existing owners and their direct children, ie. every node isOwnedBy would match."""
+    owners = (mc.ls(list(owners), long=True) or []) if owners else []
+    children = mc.listRelatives(owners, children=True, fullPath=True) if owners else None
+    return owners + (children or [])
+
+
+def findInputs(conns, nodes, src_attr) -> dict:
+    """
+    Returns {index: long name} for the entries of conns (see syncMultiInput) fed by any of the nodes' src_attr.
+    Found through the nodes' own connections, so only they are resolved rather than every connected entry.
+    """
+    src_plugs = mc.ls([f"{node}.{src_attr}" for node in nodes]) if nodes and conns else None
+    if not src_plugs:
+        return {}
+
+    dst_plugs = set(conns[0::2])
+    node_conns = mc.listConnections(src_plugs, s=False, d=True, c=True, p=True) or []
+    inputs = {}
+    for src, dst in zip(node_conns[0::2], node_conns[1::2]):
+        if dst in dst_plugs:
+            inputs[multiIndex(dst)] = mu.getLongName(src.split(".", 1)[0])
+    return inputs
+
+
+@profiler.timed()
+def syncMultiInput(graph, port, src_attr, nodes=None, added=(), removed=(), wiring=None) -> tuple[bool, list[str]]:
+    """
+    Connects each node's src_attr to the graph's multi port, only rewiring the entries that changed.
+    Entries that are still wanted keep their index, new nodes fill the indices left by removed ones, and if
+    the array shrank, entries past the end are moved down so the multi stays dense.
+    If nodes is None, the wanted nodes are the currently connected ones, minus removed (see isOwnedBy), plus added.
+    Only the removed and added nodes are resolved then, entries that did not change keep the names listConnections
+    gave them, so the cost follows the size of the delta rather than of the array.
+    Changes go through wiring (see WIRING), which the caller must apply, if None they're applied immediately via cmds.
+    Returns whether any connection changed, and the connected nodes in index order.
+    """
+    wiring = mu.CmdsWiring() if wiring is None else wiring
+    plug = f"{graph}.{port}"
+
+    # current state, index: source node
+    conns = mc.listConnections(plug, s=True, d=False, c=True) or []
+    connected = dict(zip([multiIndex(dst) for dst in conns[0::2]], conns[1::2]))
+    indices = set(mc.getAttr(plug, multiIndices=True) or []) | set(connected)
+
+    if nodes is None:
+        for index in findInputs(conns, listOwned(removed), src_attr):
+            del connected[index]
+        present = {node for index, node in findInputs(conns, added, src_attr).items() if index in connected}
+        nodes = [connected[x] for x in sorted(connected)]
+        nodes += [node for node in mu.getLongNames(added) if node not in present]
+    else:
+        connected = dict(zip(connected, mu.getLongNames(connected.values())))
+        nodes = mu.getLongNames(nodes)
+
+    # dict keys instead of set to remove dups but maintain order
+    nodes = list({node: None for node in nodes}.keys())
+    wanted = set(nodes)
+    size = len(nodes)
+
+    kept = {}  # node: index
+    for index in sorted(connected):
+        node = connected[index]
+        if node not in kept and node in wanted:
+            kept[node] = index
+
+    kept_indices = set(kept.values())
+    holes = [x for x in range(size) if x not in kept_indices]
+    pending = [node for node, index in kept.items() if index >= size]  # kept, but past the end
+    pending += [node for node in nodes if node not in kept]  # new
+
+    final = {index: node for node, index in kept.items() if index < size}  # index: node, after the changes
+    for index, node in zip(holes, pending):
+        wiring.connect(f"{node}.{src_attr}", f"{plug}[{index}]")
+        final[index] = node
+
+    trailing = sorted(index for index in indices if index >= size)
+    for index in trailing:
+        wiring.removeMultiInstance(f"{plug}[{index}]")
+
+    return bool(pending or trailing), [final[x] for x in sorted(final)]
+
+
 def createScriptNode(script_node="AllTheInputs_Callback_Script"):
     if mc.objExists(script_node):
         return script_node
@@ -311,22 +642,42 @@ def createScriptNode(script_node="AllTheInputs_Callback_Script"):
         name=script_node,
         stp="python",
         scriptType=1,  # Execute on file load or node deletion
-        bs=OPEN_SCRIPT,
-        afterScript=CLOSE_SCRIPT
+        bs=readScript("scriptNode_openScene.py"),
+        afterScript=readScript("scriptNode_closeScene.py")
     )
     return script_node
 
 
 def removeUnused():
-    for graph in mc.ls(type="bifrostGraphShape") + mc.ls(type="bifrostBoard"):
-        if not mc.objExists(f"{graph}.inputSet"):
-            continue
-
-        # has any outgoing connections
-        elif mc.listConnections(f"{graph}.object_set", s=False, d=True):
+    """
+    Deletes Input Set graphs with no output connection, then any bobify graphs left unused by them.
+    Only the callbacks of sets left without a graph are removed, see bobify.COLLECTOR for cleanup that runs on its own.
+    """
+    plugs = mc.ls("*.inputSet", recursive=True) or []
+    graphs = mc.ls([plug.split(".", 1)[0] for plug in plugs], type=["bifrostGraphShape", "bifrostBoard"]) if plugs else []
+    if not graphs:
+        return
+
+    conns = mc.listConnections([f"{graph}.object_set" for graph in graphs], s=False, d=True, c=True) or []
+    used = {plug.split(".", 1)[0] for plug in conns[0::2]}
+    unused = [graph for graph in graphs if graph not in used]
+    if not unused:
+        return
+
+    set_names = mc.listConnections([f"{graph}.inputSet" for graph in unused], s=True, d=False) or []
+    plugs = mc.ls([f"{graph}.{port}" for graph in unused for port in ("bobs", "type_bobs")])
+    bobify_graphs = mc.listConnections(plugs, s=True, d=False) or []
+    for graph in unused:
+        deleteDummyNode(graph)
+
+    # a set can feed several graphs, its callback stays while any of them is left
+    for set_name in set(set_names):
+        plugs = mc.listConnections(f"{set_name}.message", s=False, d=True, p=True) or []
+        if any(plug.split(".", 1)[1] == "inputSet" for plug in plugs):
             continue
+        callback = findCallback(set_name)
+        if callback:
+            removeCallback(callback)
 
-        else:
-            deleteDummyNode(graph)
-
-    recreateCallbacks()
+    if bobify_graphs:
+        bobify.removeUnused(list(set(bobify_graphs)))
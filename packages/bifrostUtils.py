@@ -4,6 +4,8 @@ General purpose utility for scripts involving Bifrost.
 """
 
 from maya import cmds as mc
+from . import mayaUtils as mu
+from .melBatch import MelBatch
 
 ATTR_TO_PORT_TYPE = {  # Maya attr type to Bifrost port type
     "float": "float",
@@ -29,6 +31,60 @@ ATTR_TO_PORT_TYPE = {  # Maya attr type to Bifrost port type
 }
 
 
+ATTR_INFO = {}  # (node type, attr): AttrInfo, static attrs only since dynamic attrs can differ per node
+TYPE_ATTRS = {}  # node type: long and short names of the attrs every node of the type has, see staticAttrs
+
+
+class AttrInfo:
+    """
+    Metadata for an attribute that only depends on the node type.
+    """
+    attr_type = None
+    is_multi = False
+    parent = None
+    connect_index = False  # connect the first element instead of the whole array, ie. worldMatrix
+
+    def __init__(self, node, attr):
+        self.attr_type = mc.getAttr(f"{node}.{attr}", type=True)
+        if not attr.endswith("]"):
+            self.is_multi = mc.attributeQuery(attr, node=node, m=True)
+            parents = mc.attributeQuery(attr, node=node, listParent=True)
+            self.parent = parents[0] if parents else None
+            # worldspace arrays are per instance, they can't be connected as a whole
+            self.connect_index = self.is_multi and mc.attributeQuery(attr, node=node, worldspace=True)
+
+
+def staticAttrs(node_type) -> set:
+    """
+    Returns the names of the attrs every node of the type has, long and short, queried once per type.
+    """
+    attrs = TYPE_ATTRS.get(node_type)
+    if attrs is None:
+        attrs = set(mc.attributeInfo(type=node_type, allAttributes=True) or [])
+        attrs.update(mc.attributeInfo(type=node_type, allAttributes=True, short=True) or [])
+        TYPE_ATTRS[node_type] = attrs
+    return attrs
+
+
+def cacheAttrInfo(node, attrs, node_type=None) -> dict:
+    """
+    Returns {attr: AttrInfo} for the given attrs. The static attrs not yet cached for the node type are filled
+    in one pass first, dynamic attrs are queried on the node every time since they can differ per node.
+    """
+    node_type = mu.getNodeType(node) if node_type is None else node_type
+    static = staticAttrs(node_type)
+    for attr in attrs:
+        key = (node_type, attr)
+        if key not in ATTR_INFO and attr.split("[", 1)[0] in static:
+            ATTR_INFO[key] = AttrInfo(node, attr)
+
+    return {attr: ATTR_INFO.get((node_type, attr)) or AttrInfo(node, attr) for attr in attrs}
+
+
+def getAttrInfo(node, attr, node_type=None) -> AttrInfo:
+    return cacheAttrInfo(node, [attr], node_type)[attr]
+
+
 def createGraph(name=None, as_board=False, skip_sel=True):
     if as_board:
         graph = mc.createNode("bifrostBoard", ss=skip_sel)
@@ -83,6 +139,18 @@ def getEditorGraph(preserve_sel=True):
         return None
 
 
+def nodeNames(name):
+    """
+    Yields the names Bifrost gives to nodes of the same name added to a compound without one: name, name1, name2...
+    Used to know node names ahead of time when creating them in a batch.
+    """
+    yield name
+    x = 1
+    while True:
+        yield f"{name}{x}"
+        x += 1
+
+
 def renameNode(graph, path, name_src, name_dst) -> str:
     nodes = mc.vnnCompound(graph, path, listNodes=True)
     mc.vnnCompound(graph, path, rn=[name_src, name_dst])
@@ -114,6 +182,78 @@ def createInputPort(graph, path, name, port_type="float", port_options=""):
     return mc.vnnNode(graph, path, lp=True)[-1].split(".", 1)[-1]
 
 
+def createPorts(graph, path, ports, is_output=True) -> dict:
+    """
+    Creates many ports on a node in a single mel.eval, then lists the node's ports once to get their final names.
+    ports is a list of (name, type, options). Returns {index in ports: port name}, ports that failed are left out.
+    Keyed by index since Bifrost renames duplicate names, ie. two requests for "value" give "value" and "value1".
+    """
+    if not ports:
+        return {}
+
+    flag = "createOutputPort" if is_output else "createInputPort"
+    existing = set(mc.vnnNode(graph, path, lp=True) or [])
+    with MelBatch() as batch:
+        for name, port_type, options in ports:
+            if options:
+                batch.vnnNode(graph, path, **{flag: (name, port_type)}, portOptions=options)
+            else:
+                batch.vnnNode(graph, path, **{flag: (name, port_type)})
+
+    # new ports are listed in creation order, so failed ones are dropped before pairing them up
+    failed = {x for x, _cmd in batch.errors}
+    created = [x for x in range(len(ports)) if x not in failed]
+    new_ports = [port for port in mc.vnnNode(graph, path, lp=True) if port not in existing]
+    return {x: new_port.split(".", 1)[-1] for x, new_port in zip(created, new_ports)}
+
+
+def solvePort(maya_node, maya_attr, port_name=None):
+    """
+    Solves the Bifrost port for a Maya attr.
+    Returns (attr to connect, port name, port type, port options, is multi), or None if attr type is unsupported.
+    """
+    info = getAttrInfo(maya_node, maya_attr)
+    if info.connect_index:
+        port_name = maya_attr if port_name is None else port_name
+        maya_attr += "[0]"
+        info = getAttrInfo(maya_node, maya_attr)
+
+    if port_name is None:
+        port_name = maya_attr
+    port_name = attrToPortName(port_name)
+
+    attr_type = info.attr_type
+    if attr_type not in ATTR_TO_PORT_TYPE:
+        mc.warning(f"Could not add Maya attribute, unsupported type: {maya_node}.{maya_attr} -> {attr_type}")
+        return None  # unsupported attr type
+
+    port_type = ATTR_TO_PORT_TYPE[attr_type]
+    if info.is_multi:
+        port_type = f"array<{port_type}>"
+
+    if attr_type == "nurbsCurve":
+        options = curveOptionsArg(maya_node)
+    else:
+        options = ""
+
+    return maya_attr, port_name, port_type, options, info.is_multi
+
+
+def connectMayaAttr(maya_node, maya_attr, graph, port_name, is_multi, input_node=None) -> str:
+    if not is_multi:
+        mc.connectAttr(f"{maya_node}.{maya_attr}", f"{graph}.{port_name}", f=True)
+        return port_name
+
+    try:
+        mc.connectAttr(f"{maya_node}.{maya_attr}", f"{graph}.{port_name}", f=True)
+        return port_name
+    except RuntimeError:
+        # if fails try again using index 0, remembered so this only happens once per node type for static attrs
+        getAttrInfo(maya_node, maya_attr).connect_index = True
+        mc.vnnCompound(graph, "/", deletePort=port_name)
+        return addMayaAttr(maya_node, maya_attr + "[0]", graph, input_node, port_name)
+
+
 def addMayaAttr(maya_node, maya_attr, graph, input_node=None, port_name=None, replace_existing=False):
     """
     Adds given Maya node/attr to the graph, automatically creating and connecting in-port of same or similar type.
@@ -121,12 +261,10 @@ def addMayaAttr(maya_node, maya_attr, graph, input_node=None, port_name=None, re
     """
 
     # solve port name and type
-    attr_type = mc.getAttr(f"{maya_node}.{maya_attr}", type=True)
-    is_indexed = maya_attr.endswith("]")
-    is_multi = not is_indexed and mc.attributeQuery(maya_attr, node=maya_node, m=True)
-    if port_name is None:
-        port_name = maya_attr
-    port_name = attrToPortName(port_name)
+    port = solvePort(maya_node, maya_attr, port_name)
+    if port is None:
+        return None
+    maya_attr, port_name, port_type, options, is_multi = port
 
     if replace_existing and mc.objExists(f"{graph}.{port_name}"):
         # dst port exists, so we can go straight to connecting
@@ -137,34 +275,31 @@ def addMayaAttr(maya_node, maya_attr, graph, input_node=None, port_name=None, re
         if input_node is None:
             input_node = addIONode(graph, name=maya_node.rsplit("|", 1)[-1])
 
-        if attr_type not in ATTR_TO_PORT_TYPE:
-            mc.warning(f"Could not add Maya attribute, unsupported type: {maya_node}.{maya_attr} -> {attr_type}")
-            return None  # unsupported attr type
-
-        port_type = ATTR_TO_PORT_TYPE[attr_type]
-        if is_multi:
-            port_type = f"array<{port_type}>"
-
-        if attr_type == "nurbsCurve":
-            options = curveOptionsArg(maya_node)
-        else:
-            options = ""
-
         port_name = createOutputPort(graph, input_node, port_name, port_type, port_options=options)
 
-    # Try connecting
-    if is_multi:
-        try:
-            mc.connectAttr(f"{maya_node}.{maya_attr}", f"{graph}.{port_name}", f=True)
-        except RuntimeError:
-            # if fails try again using index 0
-            mc.vnnCompound(graph, "/", deletePort=port_name)
-            addMayaAttr(maya_node, maya_attr + "[0]", graph, input_node, port_name, replace_existing)
+    return connectMayaAttr(maya_node, maya_attr, graph, port_name, is_multi, input_node)
 
-    else:
-        mc.connectAttr(f"{maya_node}.{maya_attr}", f"{graph}.{port_name}", f=True)
 
-    return port_name
+def addMayaAttrs(maya_node, maya_attrs, graph, input_node) -> dict:
+    """
+    Same as addMayaAttr for many attrs, but creating all ports in one pass, see createPorts.
+    Returns {maya attr: port name}, unsupported attrs and attrs whose port could not be created are left out.
+    """
+    cacheAttrInfo(maya_node, maya_attrs)
+    solved = {}
+    for attr in maya_attrs:
+        port = solvePort(maya_node, attr)
+        if port is not None:
+            solved[attr] = port
+
+    port_names = createPorts(graph, input_node, [port[1:4] for port in solved.values()])
+
+    ports = {}
+    for x, (attr, (src_attr, _port_name, _port_type, _options, is_multi)) in enumerate(solved.items()):
+        if x not in port_names:
+            continue
+        ports[attr] = connectMayaAttr(maya_node, src_attr, graph, port_names[x], is_multi, input_node)
+    return ports
 
 
 def curveOptionsArg(path, tangents=True, lengths=False, sample_mode=1, multiplier=1, evenly_spaced=False, seg_length=1, match_ends=False):
@@ -2,6 +2,7 @@ __version__ = "1.0.1"  # 2023-07-10 12:41
 
 import maya.api.OpenMaya as om
 from maya import cmds as mc, mel
+from . import profiler
 
 
 class UndoChunk:
@@ -55,6 +56,68 @@ class UndoState:
         self.setState(self.default_state)
 
 
+class CmdsWiring:
+    """
+    Applies connection changes immediately through cmds.
+    """
+
+    def connect(self, src, dst):
+        mc.connectAttr(src, dst, f=True)
+
+    def removeMultiInstance(self, plug):
+        mc.removeMultiInstance(plug, b=True)
+
+    def apply(self):
+        pass
+
+
+class ApiWiring(CmdsWiring):
+    """
+    Resolves plugs with OpenMaya and queues connection changes, which are applied in a single MDGModifier.doIt().
+    Changes are not added to the undo queue.
+    """
+
+    def __init__(self):
+        self.modifier = om.MDGModifier()
+        self.pending = 0
+
+    def connect(self, src, dst):
+        src_plug = getPlug(src)
+        dst_plug = getPlug(dst)
+        if dst_plug.isDestination:  # same as force
+            self.modifier.disconnect(dst_plug.source(), dst_plug)
+        self.modifier.connect(src_plug, dst_plug)
+        self.pending += 1
+
+    def removeMultiInstance(self, plug):
+        self.modifier.removeMultiInstance(getPlug(plug), True)
+        self.pending += 1
+
+    @profiler.timed()
+    def apply(self):
+        if self.pending:
+            self.modifier.doIt()
+            self.modifier = om.MDGModifier()
+            self.pending = 0
+
+
+def getPlug(plug: str) -> om.MPlug:
+    """
+    Returns the MPlug for 'node.attr' or 'node.attr[index]', the element does not need to exist yet.
+    """
+    node, attr = plug.split(".", 1)
+    if "." in attr or attr.count("[") > 1:
+        sel = om.MSelectionList()
+        sel.add(plug)
+        return sel.getPlug(0)
+
+    attr, _, index = attr.partition("[")
+    mplug = om.MFnDependencyNode(getMObject(node)).findPlug(attr, False)
+    if index:
+        mplug = mplug.elementByLogicalIndex(int(index.rstrip("]")))
+    return mplug
+
+
 def getMObject(node):
     sel = om.MSelectionList()
     sel.add(node)
@@ -66,14 +129,82 @@ def getDnName(mobj):
     return dn_fn.name()
 
 
+def getMObjectName(mobj) -> str:
+    """Same as getDnName, but returns the full path for DAG nodes."""
+    if mobj.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(mobj).fullPathName()
+    return getDnName(mobj)
+
+
+def getSetMembers(set_mobj) -> dict:
+    """
+    Returns members of the given set as {MObjectHandle hash: MObjectHandle}, without going through cmds.
+    """
+    members = {}
+    sel = om.MFnSet(set_mobj).getMembers(False)
+    for x in range(sel.length()):
+        handle = om.MObjectHandle(sel.getDependNode(x))
+        members[handle.hashCode()] = handle
+    return members
+
+
+def getLongName(node) -> str:
+    """Returns the full DAG path of a node, or its name if it is not a DAG node."""
+    sel = om.MSelectionList()
+    sel.add(node)
+    try:
+        return sel.getDagPath(0).fullPathName()
+    except TypeError:
+        return getDnName(sel.getDependNode(0))
+
+
+def getLongNames(nodes: list[str]) -> list[str]:
+    """
+    Same as getLongName for a list of nodes. Order and duplicates are preserved,
+    unlike mc.ls which may do neither.
+    """
+    return [getLongName(node) for node in nodes]
+
+
+def iterMObjects(nodes: list[str]):
+    """
+    Yields (node, MObject, MDagPath or None) for each node, resolved through OpenMaya rather than cmds.
+    """
+    sel = om.MSelectionList()
+    for node in nodes:
+        sel.clear()
+        sel.add(node)
+        try:
+            dag_path = sel.getDagPath(0)
+        except TypeError:
+            dag_path = None
+        yield node, sel.getDependNode(0), dag_path
+
+
+def getNodeType(node: str) -> str:
+    return om.MFnDependencyNode(getMObject(node)).typeName
+
+
+def getNodeTypes(nodes: list[str]) -> list[str]:
+    """Batched equivalent of mc.nodeType for each node."""
+    return [om.MFnDependencyNode(mobj).typeName for _node, mobj, _dag_path in iterMObjects(nodes)]
+
+
 def replaceTransformsWithShapes(nodes: list[str], first_only=False, no_intermediate=True) -> list:
     """
     Replaces transforms in a list with its shapes. Transforms with no shapes remain.
     """
     nodes_replaced = []
-    for node in nodes:
-        shapes = mc.listRelatives(node, shapes=True, ni=no_intermediate, fullPath=True)
-        if shapes is None:
+    for node, _mobj, dag_path in iterMObjects(nodes):
+        shapes = []
+        if dag_path is not None:
+            for x in range(dag_path.numberOfShapesDirectlyBelow()):
+                shape_path = om.MDagPath(dag_path).extendToShape(x)
+                if no_intermediate and om.MFnDagNode(shape_path).isIntermediateObject:
+                    continue
+                shapes.append(shape_path.fullPathName())
+
+        if not shapes:
             nodes_replaced.append(node)
         elif first_only:
             nodes_replaced.append(shapes[0])
@@ -0,0 +1,103 @@
+"""
+Collects Maya commands as MEL and runs them in a single mel.eval.
+Each command is wrapped in catchQuiet, so a failing command is reported instead of aborting the rest of the batch.
+"""
+
+from maya import cmds as mc, mel
+from . import profiler
+
+FAILED_PROC = """
+global proc int[] melBatchFailed() {
+    global int $gMelBatchFailed[];
+    return $gMelBatchFailed;
+}
+"""
+
+
+def melString(value) -> str:
+    return '"%s"' % str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def melValue(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, (int, float)):
+        return str(value)
+    elif isinstance(value, (list, tuple)):
+        return " ".join(melValue(v) for v in value)
+    else:
+        return melString(value)
+
+
+def melCommand(command, *args, **flags) -> str:
+    """Formats a command the same way it would be called from maya.cmds."""
+    cmd = command
+    for flag, value in flags.items():
+        cmd += f" -{flag}" if value is True else f" -{flag} {melValue(value)}"
+    for arg in args:
+        cmd += f" {melValue(arg)}"
+    return cmd
+
+
+class MelBatch:
+    errors: list
+
+    def __init__(self, warn=True):
+        self.commands = []
+        self.warn = warn
+        self.errors = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        if _type is None:
+            self.flush()
+
+    def add(self, command, *args, **flags) -> int:
+        """Adds a command, with the same args and flags as maya.cmds. Returns its index in the batch."""
+        self.commands.append(melCommand(command, *args, **flags))
+        return len(self.commands) - 1
+
+    def vnnCompound(self, graph, path, **flags):
+        return self.add("vnnCompound", graph, path, **flags)
+
+    def vnnNode(self, graph, path, **flags):
+        return self.add("vnnNode", graph, path, **flags)
+
+    def vnnConnect(self, graph, src, dst, **flags):
+        return self.add("vnnConnect", graph, src, dst, **flags)
+
+    def connectAttr(self, src, dst, force=True):
+        if force:
+            return self.add("connectAttr", src, dst, f=True)
+        return self.add("connectAttr", src, dst)
+
+    def script(self) -> str:
+        lines = ["global int $gMelBatchFailed[];", "clear $gMelBatchFailed;"]
+        for x, cmd in enumerate(self.commands):
+            lines.append(f"if (catchQuiet(`{cmd}`)) $gMelBatchFailed[size($gMelBatchFailed)] = {x};")
+        return "\n".join(lines)
+
+    @profiler.timed()
+    def flush(self) -> list:
+        """
+        Runs and clears all commands. Returns the failed commands as [(index, command)].
+        """
+        if not self.commands:
+            return []
+
+        mel.eval(FAILED_PROC)
+        mel.eval(self.script())
+        failed = mel.eval("melBatchFailed()") or []
+
+        self.errors = [(x, self.commands[x]) for x in failed]
+        self.commands = []
+        if self.warn:
+            for x, cmd in self.errors:
+                mc.warning(f"Batched command failed: {cmd}")
+
+        return self.errors
@@ -0,0 +1,209 @@
+"""
+Named timers and maya.cmds counters, for finding which phase of an operation took the time.
+Disabled by default, while disabled a timed function only costs one extra call and a global check.
+
+    from AllTheInputs.packages import profiler
+    profiler.enable()
+    ... add members to an Input Set ...
+    profiler.report()
+    profiler.exportChromeTrace("C:/temp/ati_trace.json")  # open in chrome://tracing or ui.perfetto.dev
+"""
+
+import time, json, functools
+from maya import cmds as mc, mel
+
+ENABLED = False
+TIMERS = {}  # timer name: [calls, total seconds, max seconds, commands issued while open]
+COMMANDS = {}  # innermost open timer name: {command: count}
+EVENTS = []  # (timer name, start seconds, duration seconds, depth, commands), see exportChromeTrace
+MAX_EVENTS = 200000  # events past this are dropped, timers and counters are still updated
+dropped_events = 0
+STACK = []  # open timers, innermost last
+UNTIMED = "(untimed)"  # COMMANDS key for commands issued outside any timer
+ORIGINALS = {}  # command name: original function, while commands are being counted
+EXTRA_COMMANDS = ("vnnCompound", "vnnNode", "vnnConnect", "vnn", "bifrostGraph")  # plugin commands missing from dir(mc) until loaded
+command_count = 0
+start_time = 0.0
+
+
+class Timer:
+    """
+    Times a named phase and counts the commands issued inside it. Nesting is allowed.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+        self.commands = 0
+
+    def __enter__(self):
+        STACK.append(self)
+        self.commands = command_count
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        global dropped_events
+        duration = time.perf_counter() - self.start
+        commands = command_count - self.commands
+        STACK.pop()
+
+        timer = TIMERS.get(self.name)
+        if timer is None:
+            timer = TIMERS[self.name] = [0, 0.0, 0.0, 0]
+        timer[0] += 1
+        timer[1] += duration
+        timer[2] = max(timer[2], duration)
+        timer[3] += commands
+
+        if len(EVENTS) < MAX_EVENTS:
+            EVENTS.append((self.name, self.start - start_time, duration, len(STACK), commands))
+        else:
+            dropped_events += 1
+
+
+class NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def timer(name):
+    """Context manager for timing a block, does nothing while disabled."""
+    return Timer(name) if ENABLED else NULL_TIMER
+
+
+def timed(name=None):
+    """
+    Decorator that times every call of a function, named <module>.<qualname> unless given.
+    """
+    def decorator(func):
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with Timer(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+# Command counting =====================================================================================================
+def countCommand(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global command_count
+        command_count += 1
+        phase = STACK[-1].name if STACK else UNTIMED
+        counts = COMMANDS.get(phase)
+        if counts is None:
+            counts = COMMANDS[phase] = {}
+        counts[name] = counts.get(name, 0) + 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def wrapCommands():
+    """Replaces every maya.cmds function, and mel.eval, with a counting wrapper."""
+    for name in set(dir(mc)) | set(EXTRA_COMMANDS):
+        if name.startswith("_") or name in ORIGINALS:
+            continue
+        func = getattr(mc, name, None)
+        if callable(func):
+            ORIGINALS[name] = func
+            setattr(mc, name, countCommand(name, func))
+
+    if "mel.eval" not in ORIGINALS:
+        ORIGINALS["mel.eval"] = mel.eval
+        mel.eval = countCommand("mel.eval", mel.eval)
+
+
+def unwrapCommands():
+    for name, func in ORIGINALS.items():
+        if name == "mel.eval":
+            mel.eval = func
+        else:
+            setattr(mc, name, func)
+    ORIGINALS.clear()
+
+
+# Control ==============================================================================================================
+def enable(count_commands=True):
+    """
+    Starts collecting. Results from a previous session are kept, see reset.
+    If count_commands, maya.cmds functions are wrapped until disable, which adds a little overhead to every command.
+    """
+    global ENABLED, start_time
+    if not start_time:
+        start_time = time.perf_counter()
+    if count_commands:
+        wrapCommands()
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+    unwrapCommands()
+
+
+def reset():
+    global command_count, dropped_events, start_time
+    TIMERS.clear()
+    COMMANDS.clear()
+    EVENTS.clear()
+    command_count = 0
+    dropped_events = 0
+    start_time = time.perf_counter() if ENABLED else 0.0
+
+
+def results() -> dict:
+    """Returns {"timers": {name: stats}, "commands": {timer name: {command: count}}}."""
+    timers = {}
+    for name, (calls, total, longest, commands) in sorted(TIMERS.items(), key=lambda item: -item[1][1]):
+        timers[name] = {"calls": calls, "total": total, "mean": total / calls, "max": longest, "commands": commands}
+    return {"timers": timers, "commands": COMMANDS, "dropped_events": dropped_events}
+
+
+def report(top=20):
+    """Prints the slowest timers, with the commands issued directly inside each."""
+    print(f"{'timer':<45}{'calls':>8}{'total ms':>11}{'max ms':>10}{'cmds':>9}")
+    for name, stats in list(results()["timers"].items())[:top]:
+        print(f"{name:<45}{stats['calls']:>8}{stats['total'] * 1000:>11.1f}{stats['max'] * 1000:>10.1f}{stats['commands']:>9}")
+        counts = sorted(COMMANDS.get(name, {}).items(), key=lambda item: -item[1])
+        if counts:
+            print("    " + ", ".join(f"{command}: {n}" for command, n in counts[:8]))
+    if COMMANDS.get(UNTIMED):
+        print(f"{UNTIMED}: {sum(COMMANDS[UNTIMED].values())} commands")
+
+
+def exportJson(filename):
+    with open(filename, "w") as file:
+        json.dump(results(), file, indent=4)
+
+
+def exportChromeTrace(filename):
+    """Writes the timed events in Chrome's trace event format, for chrome://tracing or ui.perfetto.dev."""
+    events = []
+    for name, start, duration, depth, commands in EVENTS:
+        events.append({
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": 1,
+            "tid": 1,
+            "args": {"commands": commands, "depth": depth},
+        })
+    with open(filename, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
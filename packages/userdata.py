@@ -1,11 +1,12 @@
 __version__ = "1.5.2"  # 2023-07-02 10:41
 
-import os, json
+import os, json, time
 from warnings import warn, simplefilter
 
 simplefilter('always')
 PRINT = True
 USERDATA_DIR = os.path.expanduser('~').replace("\\", "/")  # not implemented
+REPLACE_ATTEMPTS = 20  # see writeJson
 
 
 def setPrint(state):
@@ -28,11 +29,25 @@ def readJson(filename):
 
 
 def writeJson(filename, data, make_dirs=True):
+    """
+    Writes to a temp file that then replaces filename, so other processes never read a partly written file.
+    """
     if make_dirs:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as file:
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, 'w') as file:
         json.dump(data, file, indent=4)
 
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(temp_filename, filename)
+            return
+        except PermissionError:  # on Windows, the destination is open in another process
+            if attempt == REPLACE_ATTEMPTS - 1:
+                os.remove(temp_filename)
+                raise
+            time.sleep(0.05)
+
 
 class Params:
     filename = ""
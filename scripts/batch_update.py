@@ -0,0 +1,296 @@
+"""
+Headless batch driver, rebuilds Input Sets and their bobify graphs across many scenes.
+Scenes are fed to a pool of long-lived mayapy worker processes running in parallel, so Maya starts once per worker
+rather than once per scene.
+Nothing here touches Qt or the graph editor, so it also works without a UI.
+Compounds and the signature index are brought up to date by a single mayapy process before the pool starts,
+so the workers only read the files they share.
+
+Usage:
+    python batch_update.py shot010.ma shot020.mb --workers 4 --remove-unused --report report.json
+"""
+
+import os, sys, json, time, queue, argparse, threading, subprocess
+from collections import deque
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "ATI_RESULT "  # marks the worker's result line in its stdout
+ATI = None  # the package, imported once per worker process, see startMaya
+
+
+def defaultMayapy():
+    maya_location = os.environ.get("MAYA_LOCATION")
+    if maya_location:
+        return os.path.join(maya_location, "bin", "mayapy.exe" if os.name == "nt" else "mayapy")
+    return "mayapy"
+
+
+# Worker ===============================================================================================================
+def startMaya():
+    """
+    Runs inside mayapy. Initializes Maya and Bifrost, then imports the package without initialising it.
+    Only the first call of a process does any work.
+    """
+    global ATI
+    if ATI is None:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        from maya import cmds as mc
+        mc.loadPlugin("bifrostGraph", quiet=True)
+
+        os.environ["ATI_LAZY_INIT"] = "1"
+        sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+        ATI = __import__(os.path.basename(PACKAGE_DIR))
+    return ATI
+
+
+def prepare() -> dict:
+    """
+    Runs inside mayapy, once before any worker. Publishes missing or outdated compounds and updates the
+    signature index, which would otherwise be written by every worker at once.
+    """
+    result = {"scene": None, "ok": False, "error": None}
+    try:
+        ati = startMaya()
+        ati.signature.listSignatureTypes()
+        ati.compounds.ensureLib()
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def updateScene(scene, remove_unused=False, save=True) -> dict:
+    """
+    Runs inside mayapy. Opens the scene, updates all Input Sets, optionally removes unused graphs, then saves.
+    """
+    result = {"scene": scene, "ok": False, "error": None, "input_sets": 0, "times": {}}
+    times = result["times"]
+
+    try:
+        start = time.perf_counter()
+        ati = startMaya()  # only the first scene of a worker pays for it
+        from maya import cmds as mc
+        times["startup"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mc.file(scene, open=True, force=True, executeScriptNodes=False)  # don't create callbacks
+        times["open"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        input_sets = ati.inputSet.listInputSetsFromScene()
+        for input_set in input_sets:
+            input_set.updateGraph()
+        result["input_sets"] = len(input_sets)
+        times["update"] = time.perf_counter() - start
+
+        if remove_unused:
+            start = time.perf_counter()
+            ati.inputSet.removeUnused()
+            ati.bobify.removeUnused()
+            times["remove_unused"] = time.perf_counter() - start
+
+        if save:
+            start = time.perf_counter()
+            mc.file(save=True, force=True)
+            times["save"] = time.perf_counter() - start
+
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def serve(remove_unused=False, save=True):
+    """
+    Runs inside mayapy. Updates each scene read from stdin, one json string per line, printing a result line
+    for each, until stdin is closed.
+    """
+    for line in sys.stdin:
+        if line.strip():
+            result = updateScene(json.loads(line), remove_unused=remove_unused, save=save)
+            print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# Driver ===============================================================================================================
+class Worker:
+    """
+    A long-lived mayapy process of this script, fed one scene at a time, see serve.
+    Its output is read by a thread, so a scene can time out without blocking on the pipe.
+    """
+
+    def __init__(self, mayapy, remove_unused=False, save=True):
+        cmd = [mayapy, os.path.abspath(__file__), "--worker"]
+        if remove_unused:
+            cmd.append("--remove-unused")
+        if not save:
+            cmd.append("--no-save")
+        self.proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+        )
+        self.lines = queue.Queue()
+        self.tail = deque(maxlen=50)  # last output lines, reported if the process dies
+        threading.Thread(target=self.read, daemon=True).start()
+
+    def read(self):
+        for line in self.proc.stdout:
+            self.lines.put(line)
+        self.lines.put(None)  # end of output
+
+    def isAlive(self):
+        return self.proc.poll() is None
+
+    def update(self, scene, timeout=None) -> dict:
+        """Sends a scene and waits for its result. A timed out process is killed, the next scene starts a new one."""
+        start = time.perf_counter()
+        result = self.send(scene, timeout)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def send(self, scene, timeout=None) -> dict:
+        try:
+            self.proc.stdin.write(json.dumps(scene) + "\n")
+            self.proc.stdin.flush()
+        except OSError:
+            return {"scene": scene, "ok": False, "error": self.error()}
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=None if deadline is None else max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                self.kill()
+                return {"scene": scene, "ok": False, "error": f"Timed out after {timeout}s"}
+
+            if line is None:
+                return {"scene": scene, "ok": False, "error": self.error()}
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX):])
+            self.tail.append(line.rstrip())
+
+    def error(self) -> str:
+        self.proc.wait()
+        return "\n".join(self.tail)[-2000:] or f"Exit code {self.proc.returncode}"
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.wait()
+
+    def close(self, timeout=60):
+        """Closes stdin so the process exits once its current scene is done."""
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+def runWorker(scenes: queue.Queue, results: dict, mayapy, remove_unused=False, save=True, timeout=None):
+    """
+    Feeds scenes to one long-lived worker until none are left, starting a new one if it died or timed out.
+    results is filled with {scene index: result}.
+    """
+    worker = None
+    try:
+        while True:
+            try:
+                x, scene = scenes.get_nowait()
+            except queue.Empty:
+                return
+
+            if worker is None or not worker.isAlive():
+                worker = Worker(mayapy, remove_unused, save)
+            result = results[x] = worker.update(scene, timeout)
+            status = "OK" if result["ok"] else f"FAILED ({result['error']})"
+            print(f"{scene}: {status} in {result['seconds']:.1f}s")
+    finally:
+        if worker is not None:
+            worker.close()
+
+
+def runMayapy(cmd, scene=None, timeout=None) -> dict:
+    """Runs a mayapy process of this script, returns the result it printed."""
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"scene": scene, "ok": False, "error": f"Timed out after {timeout}s", "seconds": time.perf_counter() - start}
+
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+
+    if result is None:
+        result = {"scene": scene, "ok": False, "error": proc.stderr.strip()[-2000:] or f"Exit code {proc.returncode}"}
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run(scenes, mayapy=None, workers=None, remove_unused=False, save=True, timeout=None, report=None) -> list[dict]:
+    """
+    Updates all scenes using a pool of long-lived mayapy processes, returns the per scene results in scene order.
+    If report is given, results are also written to it as json.
+    """
+    mayapy = defaultMayapy() if mayapy is None else mayapy
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+
+    start = time.perf_counter()
+    prepared = runMayapy([mayapy, os.path.abspath(__file__), "--prepare"], timeout=timeout)
+    if not prepared["ok"]:
+        print(f"Preparing compounds and signatures FAILED ({prepared['error']}), workers will each try")
+
+    pending = queue.Queue()
+    for x, scene in enumerate(scenes):
+        pending.put((x, scene))
+
+    results = {}
+    threads = [
+        threading.Thread(target=runWorker, args=(pending, results, mayapy, remove_unused, save, timeout))
+        for _ in range(min(workers, len(scenes)))
+    ]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+    results = [results[x] for x in sorted(results)]
+
+    failed = len([result for result in results if not result["ok"]])
+    print(f"{len(results) - failed}/{len(results)} scenes updated in {time.perf_counter() - start:.1f}s")
+
+    if report:
+        with open(report, "w") as file:
+            json.dump(results, file, indent=4)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild Input Sets and bobify graphs across many scenes.")
+    parser.add_argument("scenes", nargs="*", help="Maya scene files")
+    parser.add_argument("--mayapy", help="mayapy executable, defaults to $MAYA_LOCATION/bin/mayapy")
+    parser.add_argument("--workers", type=int, help="number of parallel mayapy processes")
+    parser.add_argument("--remove-unused", action="store_true", help="also delete unused bobify/Input Set graphs")
+    parser.add_argument("--no-save", action="store_true", help="don't save scenes, useful for timing")
+    parser.add_argument("--timeout", type=float, help="seconds before a scene is abandoned")
+    parser.add_argument("--report", help="json file to write per scene results to")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.prepare:
+        result = prepare()
+        print(RESULT_PREFIX + json.dumps(result))
+        sys.exit(0 if result["ok"] else 1)
+    if args.worker:
+        serve(remove_unused=args.remove_unused, save=not args.no_save)
+        sys.exit(0)
+    if not args.scenes:
+        parser.error("at least one scene is required")
+
+    results = run(args.scenes, args.mayapy, args.workers, args.remove_unused, not args.no_save, args.timeout, args.report)
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,25 @@ The Signature contains other information such as which Maya attribute should ser
 This module also contains functions for auto-generating compounds based on Signatures.
 """
 
-import os
-from .packages.userdata import Userdata
+import os, json, hashlib
+from .packages.userdata import Userdata, readJson, writeJson
 from .packages import bifrostUtils as bif
+from .packages import mayaUtils as mu
+from .packages import profiler
 from maya import cmds as mc, mel
 from . import bobify, compounds
 from . import __MP__
 
 USER_ATTRS = False  # This has not been tested and probably should NOT be enabled
 SIGNATURES = {}  # Signatures are only loaded as needed, then cached here
+DEFAULTS_CREATED = False
+SIGNATURES_DIR = f"{__MP__}/userdata/signatures"
+INDEX_FILE = f"{__MP__}/userdata/signature_index.json"  # summary of all signature files, see loadIndex
+INDEX = None
+AUTO_SIGNATURES_DIR = f"{__MP__}/userdata/auto_signatures"  # autoSignature results, see autoSignatureKey
+STATIC_ATTRS = {}  # node type: (signature attrs, attrs that exist on every node of the type), see splitStaticAttrs
+PLUGIN_TYPES = {}  # node type: (plugin, version), rebuilt when the loaded plugins change
+LOADED_PLUGINS = None
 DEF_IGNORE_LIST = [
     "displayScalePivot",
     "caching",
@@ -97,38 +107,114 @@ DEF_IGNORE_LIST = [
 
 
 class Signature(Userdata):
+    """
+    Editable signature, backed by a json file. See SignatureSpec for the shared read-only version.
+    """
     attrs = ()
     geo_attr = None
     ignore = False
 
     def __init__(self, node_type, load=False, **kwargs):
-        super(Signature, self).__init__(f"{__MP__}/userdata/signatures/{node_type}.json", load=load, **kwargs)
+        super(Signature, self).__init__(f"{SIGNATURES_DIR}/{node_type}.json", load=load, **kwargs)
         self.p.node_type = node_type
 
-    def copy(self):
-        sig = Signature(self.p.node_type)
+    @property
+    def node_type(self):
+        return self.p.node_type
+
+    def freeze(self, saved=None) -> "SignatureSpec":
+        saved = self.exists() if saved is None else saved
+        return SignatureSpec(self.p.node_type, self.attrs, self.geo_attr, self.ignore, saved)
+
+    def save(self, publish=True):
+        super(Signature, self).save()
+        SIGNATURES[self.p.node_type] = self.freeze(saved=True)
+        updateIndex(self.p.node_type, self.dump())
+        bobify.clearPrototypes(self.p.node_type)
+        if publish:
+            compounds.requestPublish(self.p.node_type)
+
+
+class SignatureSpec:
+    """
+    Immutable signature, getSignature returns the same instance to all callers so it is never copied.
+    Use edit() for a Signature that can be changed and saved.
+    """
+    __slots__ = ("node_type", "attrs", "geo_attr", "ignore", "saved")
+
+    def __init__(self, node_type, attrs=(), geo_attr=None, ignore=False, saved=False):
+        for key, value in zip(self.__slots__, (node_type, tuple(attrs), geo_attr, ignore, saved)):
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"Signature '{self.node_type}' is immutable, use edit() instead")
+
+    def exists(self):
+        return self.saved
+
+    def edit(self) -> Signature:
+        sig = Signature(self.node_type)
         sig.ignore = self.ignore
         sig.attrs = list(self.attrs)
         sig.geo_attr = self.geo_attr
         return sig
 
-    def save(self, publish=True):
-        super(Signature, self).save()
-        SIGNATURES[self.p.node_type] = self
-        if publish:
-            compounds.publishMakeAndBreakSig(self.p.node_type)
+    def view(self, attrs):
+        """Returns a per-node view with a subset of attrs, or self if the attrs are unchanged."""
+        attrs = tuple(attrs)
+        return self if attrs == self.attrs else NodeSignature(self, attrs)
+
+
+class NodeSignature:
+    """
+    A SignatureSpec with its attrs filtered for a particular node, see prepareSignature.
+    """
+    __slots__ = ("spec", "attrs")
+
+    def __init__(self, spec: SignatureSpec, attrs: tuple):
+        self.spec = spec
+        self.attrs = attrs
+
+    @property
+    def node_type(self):
+        return self.spec.node_type
+
+    @property
+    def geo_attr(self):
+        return self.spec.geo_attr
+
+    @property
+    def ignore(self):
+        return self.spec.ignore
+
+    def exists(self):
+        return self.spec.exists()
+
+    def edit(self) -> Signature:
+        return self.spec.edit()
+
+    def view(self, attrs):
+        attrs = tuple(attrs)
+        return self if attrs == self.attrs else NodeSignature(self.spec, attrs)
+
 
+def ensureDefaultSignatures():
+    if not DEFAULTS_CREATED:
+        createDefaultSignatures()
 
-def getSignature(node_type):
+
+@profiler.timed()
+def getSignature(node_type) -> SignatureSpec:
+    ensureDefaultSignatures()
     if node_type not in SIGNATURES:
         sig = Signature(node_type)
         if sig.exists():
             sig.load()
-            SIGNATURES[node_type] = sig
+            SIGNATURES[node_type] = sig.freeze(saved=True)
         else:
-            SIGNATURES[node_type] = autoSignature(node_type)
+            SIGNATURES[node_type] = autoSignature(node_type).freeze(saved=False)
 
-    return SIGNATURES[node_type].copy()
+    return SIGNATURES[node_type]
 
 
 def deleteDummyNode(node):
@@ -137,6 +223,8 @@ def deleteDummyNode(node):
 
 
 def createDefaultSignatures():
+    global DEFAULTS_CREATED
+    DEFAULTS_CREATED = True
     # Current functions throughout this package really expect graphs as inputs.
     sig = Signature("bifrostGraphShape", ignore=True)
     if not sig.exists():
@@ -146,23 +234,68 @@ def createDefaultSignatures():
         sig.save(publish=False)
 
 
-def listSignatureTypes(filter_ignored=False):
-    node_types = []
-    for filename in os.listdir(f"{__MP__}/userdata/signatures"):
-        node_types.append(os.path.splitext(filename)[0])
+def contentHash(data) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def indexEntry(data: dict, mtime) -> dict:
+    return {
+        "ignore": data.get("ignore", False),
+        "geo_attr": data.get("geo_attr"),
+        "attrs": data.get("attrs", []),
+        "hash": contentHash(data),
+        "mtime": mtime,
+    }
+
+
+def loadIndex() -> dict:
+    """
+    Returns the signature index {node type: entry}, see indexEntry.
+    Only signature files that are new or modified since they were indexed are read.
+    """
+    global INDEX
+    if INDEX is None:
+        INDEX = readJson(INDEX_FILE) or {}
+
+    changed = False
+    found = set()
+    for entry in os.scandir(SIGNATURES_DIR):
+        node_type = os.path.splitext(entry.name)[0]
+        found.add(node_type)
+        mtime = entry.stat().st_mtime
+        if node_type not in INDEX or INDEX[node_type]["mtime"] != mtime:
+            INDEX[node_type] = indexEntry(readJson(entry.path) or {}, mtime)
+            changed = True
+
+    for node_type in set(INDEX) - found:  # deleted files
+        del INDEX[node_type]
+        changed = True
+
+    if changed:
+        writeJson(INDEX_FILE, INDEX)
+    return INDEX
+
+
+def updateIndex(node_type, data: dict):
+    index = loadIndex() if INDEX is None else INDEX
+    index[node_type] = indexEntry(data, os.stat(f"{SIGNATURES_DIR}/{node_type}.json").st_mtime)
+    writeJson(INDEX_FILE, index)
 
-    if filter_ignored:
-        node_types = [node_type for node_type in node_types if not getSignature(node_type).ignore]
 
-    return node_types
+def listSignatureTypes(filter_ignored=False):
+    ensureDefaultSignatures()
+    index = loadIndex()
+    if filter_ignored:
+        return [node_type for node_type, entry in index.items() if not entry["ignore"]]
+    return list(index)
 
 
 def filterChildAttrs(node, attrs):
     attrs = [attr for attr in attrs if "." not in attr]
+    infos = bif.cacheAttrInfo(node, attrs)
     attrs2 = []
     for attr in attrs:
-        parent_attrs = mc.attributeQuery(attr, node=node, listParent=True)
-        if not (parent_attrs and parent_attrs[0] in attrs):
+        if infos[attr].parent not in attrs:
             attrs2.append(attr)
 
     return attrs2
@@ -178,8 +311,52 @@ def listUserAttrs(node, filter_children=True):
         return attrs
 
 
-def autoSignature(node_type):
+def getOwningPlugin(node_type):
+    """
+    Returns (plugin, version) of the plugin that registers the node type, or None for built-in types.
+    """
+    global LOADED_PLUGINS
+    plugins = mc.pluginInfo(q=True, listPlugins=True) or []
+    if plugins != LOADED_PLUGINS:
+        LOADED_PLUGINS = plugins
+        PLUGIN_TYPES.clear()
+        for plugin in plugins:
+            version = mc.pluginInfo(plugin, q=True, version=True)
+            for plugin_type in mc.pluginInfo(plugin, q=True, dependNode=True) or []:
+                PLUGIN_TYPES[plugin_type] = (plugin, version)
+
+    return PLUGIN_TYPES.get(node_type)
+
+
+def autoSignatureKey(node_type):
+    """
+    An auto generated signature only depends on the node type, Maya version and the version of its plugin.
+    """
+    plugin = getOwningPlugin(node_type)
+    return {
+        "node_type": node_type,
+        "maya": mc.about(apiVersion=True),
+        "plugin": list(plugin) if plugin else None,
+    }
+
+
+@profiler.timed()
+def autoSignature(node_type, use_cache=True):
+    """
+    Generates a signature from a dummy node of the type.
+    Results are cached on disk, so the dummy node is only created once per Maya/plugin version.
+    """
     sig = Signature(node_type)
+    filename = f"{AUTO_SIGNATURES_DIR}/{node_type}.json"
+    key = autoSignatureKey(node_type)
+
+    if use_cache:
+        cached = readJson(filename)
+        if cached is not None and cached.get("key") == key:
+            sig.attrs = cached["attrs"]
+            sig.geo_attr = cached["geo_attr"]
+            return sig
+
     node = mc.createNode(node_type, ss=True)
     sig.attrs = mc.listAttr(node, read=True, visible=True)
     sig.attrs = filterChildAttrs(node, sig.attrs)
@@ -193,33 +370,61 @@ def autoSignature(node_type):
     sig.attrs = [attr for attr in sig.attrs if attr not in DEF_IGNORE_LIST]
 
     # search for geo attr
+    infos = bif.cacheAttrInfo(node, sig.attrs, node_type)
     for attr in sig.attrs:
-        attr_type = mc.getAttr(f"{node}.{attr}", type=True)
+        attr_type = infos[attr].attr_type
         if attr_type == "mesh" or attr_type == "nurbsCurve":
             sig.geo_attr = attr
             sig.attrs.remove(attr)
             break
 
     deleteDummyNode(node)
+    try:
+        writeJson(filename, {"key": key, "attrs": sig.attrs, "geo_attr": sig.geo_attr})
+    except OSError as e:  # ie. read-only install, the signature is still valid, just not cached
+        mc.warning(f"Could not cache auto signature for {node_type}: {e}")
     return sig
 
 
+def splitStaticAttrs(sig) -> tuple[set, list]:
+    """
+    Splits signature attrs into static attrs which exist on every node of the type, and dynamic attrs which may
+    only exist on some nodes. The split is only computed once per type, unless the signature's attrs change.
+    """
+    cached = STATIC_ATTRS.get(sig.node_type)
+    if cached is None or cached[0] != sig.attrs:
+        static = bif.staticAttrs(sig.node_type).intersection(sig.attrs)
+        cached = STATIC_ATTRS[sig.node_type] = (sig.attrs, static)
+
+    static = cached[1]
+    return static, [attr for attr in sig.attrs if attr not in static]
+
+
+@profiler.timed()
 def prepareSignature(node):
-    sig = getSignature(mc.nodeType(node))
+    sig = getSignature(mu.getNodeType(node))
 
     if not sig.exists():
-        sig = setSignatureDialog(None, sig=sig)
+        if mc.about(batch=True):  # no UI to ask the user, same as cancelling the dialog
+            mc.warning(f"No signature saved for '{sig.node_type}', can't ask in batch mode")
+            sig = SignatureSpec(sig.node_type, sig.attrs, sig.geo_attr, ignore=True)
+        else:
+            sig = setSignatureDialog(None, sig=sig)
 
     if sig.ignore:
         print(f"Ignoring {node}")
         return sig
 
-    sig.attrs = [attr for attr in sig.attrs if mc.objExists(f"{node}.{attr}")]  # verify attrs exist
+    # verify attrs exist, only dynamic attrs need to be checked per node
+    # indexed/compound attrs (ie. worldMatrix[0]) and short names aren't found by either query, so are checked directly
+    static, dynamic = splitStaticAttrs(sig)
+    user_attrs = set(mc.listAttr(node, userDefined=True) or []) if dynamic or USER_ATTRS else set()
+    attrs = [attr for attr in sig.attrs if attr in static or attr in user_attrs or mc.objExists(f"{node}.{attr}")]
 
     if USER_ATTRS:
-        sig.attrs.extend(listUserAttrs(node))
+        attrs.extend(listUserAttrs(node))
 
-    return sig
+    return sig.view(attrs)
 
 
 def setSignatureWindow(sig):
@@ -241,13 +446,14 @@ def setSignatureWindow(sig):
     return msg
 
 
-def setSignatureDialog(node_type, sig: Signature = None):
+def setSignatureDialog(node_type, sig: SignatureSpec = None) -> SignatureSpec:
     if sig is not None:
-        node_type = sig.p.node_type
+        node_type = sig.node_type
     elif node_type is not None:
         sig = getSignature(node_type)
     else:
         raise ValueError("Must provide valid node type or Signature")
+    sig = sig.edit()
 
     # Get user input
     msg = setSignatureWindow(sig)
@@ -255,7 +461,7 @@ def setSignatureDialog(node_type, sig: Signature = None):
         sig.ignore = True
         if msg.result() == msg.Discard:
             sig.save()
-        return sig
+        return sig.freeze()
 
     # Geo attr
     sig.geo_attr = msg.geo_attr_edit.text().strip(" ")
@@ -279,7 +485,7 @@ def setSignatureDialog(node_type, sig: Signature = None):
     # Finalize
     sig.ignore = False
     sig.save()
-    return sig
+    return sig.freeze(saved=True)
 
 
 def setSelSignature():
@@ -293,5 +499,3 @@ def setSelSignature():
     shapes = mc.listRelatives(node, shapes=True, ni=True, fullPath=True)
     setSignatureDialog(mc.nodeType(shapes[0] if shapes else node))
 
-
-createDefaultSignatures()
@@ -0,0 +1,131 @@
+"""
+bobify.BobifyIndex consumer counting and bobify.BobifyCollector against the offline Maya stand-in,
+see benchmarks/fakeMaya.py.
+
+    python -m pytest tests
+"""
+
+import os, sys, tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import benchmark  # installs fakeMaya and imports the package
+
+from maya import cmds as mc
+import maya.api.OpenMaya as om
+
+SCENE = benchmark.SCENE
+bobify = benchmark.ati.bobify
+mu = bobify.mu
+INDEX = bobify.BOBIFY_INDEX
+COLLECTOR = bobify.COLLECTOR
+
+
+@pytest.fixture
+def input_set():
+    benchmark.newScene(f"{tempfile.mkdtemp()}/userdata")
+    cameras = [SCENE.createShape("camera", f"camera{x}").name for x in range(2)]
+    input_set = benchmark.newInputSet(SCENE.createSet("bobSet", cameras).name)
+    input_set.updateGraph()
+    return input_set
+
+
+def bobs(input_set) -> list[str]:
+    return mc.listConnections(f"{input_set.graph}.bobs", s=True, d=False) or []
+
+
+def cameraShape(x) -> str:
+    return mu.replaceTransformsWithShapes([f"camera{x}"])[0]
+
+
+def removeCamera(input_set, x) -> str:
+    """Removes camera x from the set, returns its bobify graph, which the update disconnects."""
+    graph = INDEX.findGraph(cameraShape(x))
+    SCENE.removeMembers(input_set.name, [f"camera{x}"])
+    input_set.updateGraph(removed=[SCENE.get(f"camera{x}").longName()])
+    assert graph not in bobs(input_set)
+    return graph
+
+
+def sceneMessage(message):
+    for kind, _node, function in list(SCENE.callbacks.values()):
+        if kind == f"scene{message}":
+            function(None)
+
+
+def testReleasedOnlyInsideCollector(input_set):
+    graph = removeCamera(input_set, 0)
+    assert not COLLECTOR.released
+    SCENE.flushDeferred()
+    assert mc.objExists(graph)
+
+    with COLLECTOR:
+        graph = removeCamera(input_set, 1)
+    assert list(COLLECTOR.released) == [om.MObjectHandle(mu.getMObject(graph)).hashCode()]
+    SCENE.flushDeferred()
+    assert not mc.objExists(graph)
+    assert COLLECTOR.collected == 1
+
+
+def testReconnectedBeforeCollectIsKept(input_set):
+    with COLLECTOR:
+        graph = removeCamera(input_set, 0)
+        SCENE.addMembers(input_set.name, ["camera0"])
+        input_set.updateGraph(added=[SCENE.get("camera0").longName()])
+    assert graph in bobs(input_set)
+    SCENE.flushDeferred()
+    assert mc.objExists(graph)
+    assert COLLECTOR.collected == 0
+
+
+def testOtherConsumersIgnored(input_set):
+    graph = INDEX.findGraph(cameraShape(0))
+    other = benchmark.bif.createGraph("other_graph")
+    mc.connectAttr(f"{graph}.{bobify.OUT_PORT_NAME}", f"{other}.bobs[0]")
+    assert INDEX.getConsumers(graph) == mu.getLongNames([input_set.graph])
+
+    with COLLECTOR:
+        removeCamera(input_set, 0)
+    assert not INDEX.getConsumers(graph)
+    SCENE.flushDeferred()
+    assert not mc.objExists(graph)
+
+
+def testIndexRebuiltWhilePending(input_set):
+    with COLLECTOR:
+        graph = removeCamera(input_set, 0)
+    assert COLLECTOR.collect_pending
+
+    # reconnected while the index is dirty, so only the rebuild in collect can count it
+    INDEX.markDirty()
+    mc.connectAttr(f"{graph}.{bobify.OUT_PORT_NAME}", f"{input_set.graph}.bobs[5]")
+    SCENE.flushDeferred()
+    assert not INDEX.dirty
+    assert mc.objExists(graph)
+    assert INDEX.getConsumers(graph) == mu.getLongNames([input_set.graph])
+
+
+def testIndexTracksConnections(input_set):
+    graph = INDEX.findGraph(cameraShape(0))
+    shape = cameraShape(1)
+    mc.connectAttr(f"{shape}.message", f"{graph}.bobifySource", f=True)
+    assert graph in INDEX.find(shape)
+    assert INDEX.getSources(graph) == [SCENE.get(shape).longName()]
+
+
+def testIndexTracksNodeRemoval(input_set):
+    graph = INDEX.findGraph(cameraShape(0))
+    key = om.MObjectHandle(mu.getMObject(graph)).hashCode()
+    mc.delete(graph)
+    assert key not in INDEX.graphs and key not in INDEX.consumers
+    assert not INDEX.find(cameraShape(0))
+    assert not INDEX.dirty
+
+
+def testIndexDirtyOnSceneLoad(input_set):
+    assert not INDEX.dirty
+    sceneMessage(om.MSceneMessage.kBeforeOpen)
+    assert INDEX.dirty
+    assert INDEX.findGraph(cameraShape(0))  # rebuilt on next use
+    assert not INDEX.dirty
@@ -0,0 +1,115 @@
+"""
+inputSet.syncMultiInput against the offline Maya stand-in, see benchmarks/fakeMaya.py.
+
+    python -m pytest tests
+"""
+
+import os, sys, tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import benchmark  # installs fakeMaya and imports the package
+
+from maya import cmds as mc
+
+SCENE = benchmark.SCENE
+inputSet = benchmark.ati.inputSet
+mu = inputSet.mu
+
+
+@pytest.fixture
+def graph():
+    benchmark.newScene(f"{tempfile.mkdtemp()}/userdata")
+    return benchmark.bif.createGraph("test_graph")
+
+
+@pytest.fixture(params=["cmds", "api"])
+def wiring(request):
+    return inputSet.WIRING[request.param]
+
+
+def createMeshes(n) -> list[str]:
+    return [SCENE.createShape("mesh", f"mesh{x}").longName() + f"|mesh{x}Shape" for x in range(n)]
+
+
+def elements(graph) -> list[str]:
+    """Long names connected to graph.meshes, in index order."""
+    conns = mc.listConnections(f"{graph}.meshes", s=True, d=False, c=True) or []
+    connected = dict(zip([inputSet.multiIndex(dst) for dst in conns[0::2]], mu.getLongNames(conns[1::2])))
+    return [connected[x] for x in sorted(connected)]
+
+
+def indices(graph) -> list[int]:
+    return mc.getAttr(f"{graph}.meshes", multiIndices=True) or []
+
+
+def sync(graph, wiring, *args, **kwargs):
+    wiring = wiring()
+    result = inputSet.syncMultiInput(graph, "meshes", "worldMesh[0]", *args, wiring=wiring, **kwargs)
+    wiring.apply()
+    return result
+
+
+def testConnectsInOrder(graph, wiring):
+    meshes = createMeshes(3)
+    assert sync(graph, wiring, meshes) == (True, meshes)
+    assert elements(graph) == meshes
+
+
+def testUnchangedIsNoop(graph, wiring):
+    meshes = createMeshes(3)
+    sync(graph, wiring, meshes)
+    assert sync(graph, wiring, meshes) == (False, meshes)
+    changed, nodes = sync(graph, wiring, added=[], removed=[])
+    assert not changed
+    assert mu.getLongNames(nodes) == meshes
+
+
+def testRemovedFromMiddleCompacts(graph, wiring):
+    meshes = createMeshes(4)
+    sync(graph, wiring, meshes)
+
+    changed, nodes = sync(graph, wiring, [meshes[0], meshes[2], meshes[3]])
+    assert changed
+    assert indices(graph) == [0, 1, 2]
+    assert nodes == elements(graph) == [meshes[0], meshes[3], meshes[2]]  # last entry moved into the hole
+
+
+def testAddedFillsHole(graph, wiring):
+    meshes = createMeshes(4)
+    sync(graph, wiring, meshes[:3])
+
+    changed, nodes = sync(graph, wiring, [meshes[3], meshes[0], meshes[2]])
+    assert changed
+    assert nodes == elements(graph) == [meshes[0], meshes[3], meshes[2]]
+
+
+def testDeltaMatchesElementOrder(graph, wiring):
+    meshes = createMeshes(5)
+    sync(graph, wiring, meshes[:4])
+
+    transform = meshes[1].rsplit("|", 1)[0]  # removing a transform removes its shape
+    changed, nodes = sync(graph, wiring, added=[meshes[4]], removed=[transform])
+    assert changed
+    assert indices(graph) == [0, 1, 2, 3]
+    assert mu.getLongNames(nodes) == elements(graph) == [meshes[0], meshes[4], meshes[2], meshes[3]]
+
+
+def testDeltaSkipsConnected(graph, wiring):
+    meshes = createMeshes(3)
+    sync(graph, wiring, meshes)
+
+    changed, nodes = sync(graph, wiring, added=[meshes[1]])
+    assert not changed
+    assert mu.getLongNames(nodes) == elements(graph) == meshes
+
+
+def testDeltaShrinks(graph, wiring):
+    meshes = createMeshes(4)
+    sync(graph, wiring, meshes)
+
+    changed, nodes = sync(graph, wiring, removed=[meshes[0], meshes[3]])
+    assert changed
+    assert indices(graph) == [0, 1]
+    assert mu.getLongNames(nodes) == elements(graph) == [meshes[2], meshes[1]]